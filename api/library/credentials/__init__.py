@@ -1,7 +1,6 @@
 """Handle credentials requests."""
 
-import json
-
+import orjson
 from open_alchemy import package_database, package_security
 
 from .. import config, types
@@ -43,7 +42,7 @@ def get(user: types.TUser) -> server.Response:
         )
 
     return server.Response(
-        json.dumps(
+        orjson.dumps(
             {
                 "public_key": public_key,
                 "secret_key": secret_key,
@@ -108,10 +108,11 @@ class _StorageFacade:
 
         """
         id_ = cls.cal_id(name)
-        delete_keys = get_storage().list(prefix=f"{user}/{id_}")
+        storage = get_storage()
+        delete_keys = storage.list(prefix=f"{user}/{id_}")
         if not delete_keys:
             raise exceptions.StorageError("no keys to delete")
-        get_storage().delete_all(keys=delete_keys)
+        storage.delete_all(keys=delete_keys)
 
     @classmethod
     def get_spec_versions(
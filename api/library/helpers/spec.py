@@ -1,6 +1,7 @@
 """Helpers for spec."""
 
 import dataclasses
+import hashlib
 import json
 import typing
 
@@ -8,21 +9,28 @@ import open_alchemy
 import yaml
 from open_alchemy import build
 from packaging import version as packaging_version
-from yaml import parser, scanner
 
 from .. import exceptions, types
 
 TSpec = typing.Dict[str, typing.Any]
 
+SUPPORTED_LANGUAGES = frozenset({"JSON", "YAML"})
 
-def load(*, spec_str: str, language: str) -> TSpec:
+# Use the libyaml based loader and dumper if PyYAML was built with it
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+_YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+
+def load(*, body: bytes, language: str) -> TSpec:
     """
-    Load the spec from a string using a particular language.
+    Load the spec from the bytes of a request body using a particular language.
+
+    The body is passed to the parsers as bytes, which detect its encoding.
 
     Raises LoadSpecError if loading the spec fails.
 
     Args:
-        spec_str: The string of the spec.
+        body: The encoded spec.
         language: The language to use for loading.
 
     Returns:
@@ -31,13 +39,14 @@ def load(*, spec_str: str, language: str) -> TSpec:
     """
     if language == "YAML":
         try:
-            return yaml.safe_load(spec_str)
-        except (parser.ParserError, scanner.ScannerError) as exc:
+            return yaml.load(body, Loader=_YAML_LOADER)
+        except yaml.YAMLError as exc:
             raise exceptions.LoadSpecError("body must be valid YAML") from exc
     elif language == "JSON":
+        # The json module rather than orjson, because it accepts Infinity and NaN
         try:
-            return json.loads(spec_str)
-        except json.JSONDecodeError as exc:
+            return json.loads(body)
+        except ValueError as exc:
             raise exceptions.LoadSpecError("body must be valid JSON") from exc
 
     raise exceptions.LoadSpecError(
@@ -45,6 +54,20 @@ def load(*, spec_str: str, language: str) -> TSpec:
     )
 
 
+def calc_hash(body: bytes) -> str:
+    """
+    Calculate the hash of the body of a request with a spec.
+
+    Args:
+        body: The body of the request.
+
+    Returns:
+        The hex encoded SHA-256 hash of the body.
+
+    """
+    return hashlib.sha256(body).hexdigest()
+
+
 @dataclasses.dataclass
 class TSpecInfo:
     """
@@ -83,16 +106,16 @@ def calc_version(value: types.TSpecVersion) -> str:
         return str(int.from_bytes(value[0:5].encode(), "big"))
 
 
-def process(*, spec_str: str, language: str) -> TSpecInfo:
+def process(*, body: bytes, language: str) -> TSpecInfo:
     """
     Check that the spec is valid and calculates the version.
 
     Args:
-        spec_str: The string to process.
+        body: The encoded spec to process.
         language: The language of the spec, either YAML or JSON.
 
     """
-    spec = load(spec_str=spec_str, language=language)
+    spec = load(body=body, language=language)
     try:
         schemas = build.get_schemas(spec=spec)
     except open_alchemy.exceptions.MalformedSchemaError as exc:
@@ -101,6 +124,8 @@ def process(*, spec_str: str, language: str) -> TSpecInfo:
 
     version = calc_version(spec_info.version)
 
+    # Counting in the serialized spec is a single pass in C over the string, walking
+    # the schemas in Python would be slower
     model_count = spec_info.spec_str.count('"x-tablename":')
 
     return TSpecInfo(
@@ -116,7 +141,9 @@ def prepare(*, spec_str: str, version: str) -> str:
     """
     Prepare a stored spec to be returned to the user.
 
-    De-serializes using JSON, adds version and serializes using YAML.
+    De-serializes using JSON, adds version and serializes using YAML. The stored spec
+    is parsed with the json module because it was written by json.dumps, which
+    represents infinite and NaN values as Infinity and NaN and orjson rejects those.
 
     Args:
         spec_str: The spec as it is stored.
@@ -131,4 +158,6 @@ def prepare(*, spec_str: str, version: str) -> str:
     if "info" in spec:
         info = {**info, **spec["info"]}
     components = spec["components"]
-    return yaml.dump({"info": info}) + yaml.dump({"components": components})
+    return yaml.dump({"info": info}, Dumper=_YAML_DUMPER) + yaml.dump(
+        {"components": components}, Dumper=_YAML_DUMPER
+    )
@@ -0,0 +1,87 @@
+"""Helper for storing specs."""
+
+import typing
+
+from open_alchemy import package_database
+
+from .. import config, types
+from ..facades import storage
+from . import spec
+
+
+def is_unchanged(
+    *,
+    user: types.TUser,
+    spec_name: types.TSpecName,
+    spec_hash: str,
+    version: typing.Optional[types.TSpecVersion] = None,
+) -> bool:
+    """
+    Check whether the latest version of a spec was created from the same spec.
+
+    Args:
+        user: The user that owns the spec.
+        spec_name: The name of the spec.
+        spec_hash: The hash of the spec.
+        version: The requested version of the spec, if any.
+
+    Returns:
+        Whether the hash, and the version if requested, match the latest version.
+
+    """
+    hash_info = package_database.get().get_latest_spec_version_hash(
+        sub=user, name=spec_name
+    )
+    if hash_info is None or hash_info.spec_hash != spec_hash:
+        return False
+    return version is None or hash_info.version == version
+
+
+def create_update_spec(
+    *,
+    user: types.TUser,
+    spec_name: types.TSpecName,
+    spec_info: spec.TSpecInfo,
+    spec_hash: str,
+) -> None:
+    """
+    Write a spec to the database and then to storage.
+
+    The spec is only written to storage once the database has accepted it, for
+    example because the free tier would not be exceeded, so that a rejected spec
+    never changes the stored spec.
+
+    If the storage write fails, the hash is deleted from the database again so that
+    uploading the same spec again is not skipped as unchanged.
+
+    Args:
+        user: The user that owns the spec.
+        spec_name: The name of the spec.
+        spec_info: The processed spec.
+        spec_hash: The hash of the spec the processed spec was created from.
+
+    """
+    database = package_database.get()
+    database.create_update_spec(
+        sub=user,
+        name=spec_name,
+        version=spec_info.version,
+        title=spec_info.title,
+        description=spec_info.description,
+        model_count=spec_info.model_count,
+        free_tier_model_count=config.get().free_tier_model_count,
+        spec_hash=spec_hash,
+    )
+
+    try:
+        storage.get_storage_facade().create_update_spec(
+            user=user,
+            name=spec_name,
+            version=spec_info.version,
+            spec_str=spec_info.spec_str,
+        )
+    except storage.exceptions.StorageError:
+        database.delete_latest_spec_version_hash(
+            sub=user, name=spec_name, spec_hash=spec_hash
+        )
+        raise
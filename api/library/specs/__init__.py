@@ -1,12 +1,11 @@
 """Handle specs endpoint."""
 
-import json
-
+import orjson
 from open_alchemy import package_database
 
 from .. import exceptions, types
 from ..facades import server, storage
-from ..helpers import free_tier, spec
+from ..helpers import spec, store
 
 
 def list_(user: types.TUser) -> server.Response:
@@ -22,7 +21,7 @@ def list_(user: types.TUser) -> server.Response:
     """
     try:
         return server.Response(
-            json.dumps(package_database.get().list_specs(sub=user)),
+            orjson.dumps(package_database.get().list_specs(sub=user)),
             status=200,
             mimetype="application/json",
         )
@@ -56,7 +55,7 @@ def get(spec_name: types.TSpecId, user: types.TUser) -> server.Response:
         prepared_spec_str = spec.prepare(spec_str=spec_str, version=version)
         spec_info = package_database.get().get_spec(sub=user, name=spec_name)
 
-        response_data = json.dumps({**spec_info, "value": prepared_spec_str})
+        response_data = orjson.dumps({**spec_info, "value": prepared_spec_str})
 
         return server.Response(
             response_data,
@@ -89,12 +88,12 @@ def get(spec_name: types.TSpecId, user: types.TUser) -> server.Response:
         )
 
 
-def put(
-    body: bytearray, spec_name: types.TSpecId, user: types.TUser
-) -> server.Response:
+def put(body: bytes, spec_name: types.TSpecId, user: types.TUser) -> server.Response:
     """
     Accept a spec and store it.
 
+    Skips storing the spec if the latest version was created from the same spec.
+    Returns 400 if the X-LANGUAGE header is missing or not supported.
     Returns 400 if the spec is not valid.
     Returns 402 if the free tier is exceeded.
     Returns 500 if something went wrong.
@@ -108,39 +107,27 @@ def put(
         The response to the request.
 
     """
-    language = server.Request.request.headers["X-LANGUAGE"]
+    language = server.Request.request.headers.get("X-LANGUAGE")
+    if language not in spec.SUPPORTED_LANGUAGES:
+        return server.Response(
+            "the X-LANGUAGE header must be JSON or YAML",
+            status=400,
+            mimetype="text/plain",
+        )
+    spec_hash = spec.calc_hash(body)
 
     try:
-        # Check whether spec is valid
-        spec_info = spec.process(spec_str=body.decode(), language=language)
+        # Skip processing and writing the spec if it has not changed
+        if store.is_unchanged(user=user, spec_name=spec_name, spec_hash=spec_hash):
+            return server.Response(status=204)
 
-        # Check that the maximum number of models hasn't been exceeded
-        within_free_tier_result = free_tier.check_within_limit(
-            user=user, spec_name=spec_name, model_count=spec_info.model_count
-        )
-        if not within_free_tier_result.value:
-            return server.Response(
-                within_free_tier_result.reason,
-                status=402,
-                mimetype="text/plain",
-            )
-
-        # Store the spec
-        storage.get_storage_facade().create_update_spec(
-            user=user,
-            name=spec_name,
-            version=spec_info.version,
-            spec_str=spec_info.spec_str,
-        )
+        # Check whether spec is valid
+        spec_info = spec.process(body=body, language=language)
 
-        # Write an update into the database
-        package_database.get().create_update_spec(
-            sub=user,
-            name=spec_name,
-            version=spec_info.version,
-            title=spec_info.title,
-            description=spec_info.description,
-            model_count=spec_info.model_count,
+        # Write the spec to the database and storage, fails if the free tier is
+        # exceeded
+        store.create_update_spec(
+            user=user, spec_name=spec_name, spec_info=spec_info, spec_hash=spec_hash
         )
 
         return server.Response(status=204)
@@ -158,6 +145,12 @@ def put(
             status=500,
             mimetype="text/plain",
         )
+    except package_database.exceptions.FreeTierExceededError as exc:
+        return server.Response(
+            str(exc),
+            status=402,
+            mimetype="text/plain",
+        )
     except package_database.exceptions.BaseError:
         return server.Response(
             "something went wrong whilst updating the database",
@@ -1,12 +1,40 @@
 """Handle specs versions endpoint."""
 
-import json
+import functools
 
+import orjson
 from open_alchemy import package_database
 
 from ... import exceptions, types
 from ...facades import server, storage
-from ...helpers import free_tier, spec
+from ...helpers import spec, store
+
+# Constructors for the responses returned by the endpoints
+_OK = functools.partial(server.Response, status=200, mimetype="application/json")
+_NO_CONTENT = functools.partial(server.Response, status=204)
+_NOT_MODIFIED = functools.partial(server.Response, status=304)
+_BAD_REQUEST = functools.partial(server.Response, status=400, mimetype="text/plain")
+_PAYMENT_REQUIRED = functools.partial(
+    server.Response, status=402, mimetype="text/plain"
+)
+_NOT_FOUND = functools.partial(server.Response, status=404, mimetype="text/plain")
+_SERVER_ERROR = functools.partial(server.Response, status=500, mimetype="text/plain")
+
+# Messages of the error responses, the templates are formatted with encoded values
+_MSG_LANGUAGE_NOT_SUPPORTED = b"the X-LANGUAGE header must be JSON or YAML"
+_MSG_SPEC_NOT_VALID = b"the spec is not valid, %b"
+_MSG_VERSION_MISMATCH = (
+    b"the requested version %b does not match the version of the spec %b"
+)
+_MSG_SPEC_NOT_FOUND = b"could not find spec with id %b"
+_MSG_SPEC_VERSION_NOT_FOUND = b"could not find the spec with id %b"
+_MSG_DATABASE_READ_ERROR = b"something went wrong whilst reading from the database"
+_MSG_DATABASE_WRITE_ERROR = b"something went wrong whilst updating the database"
+_MSG_STORAGE_READ_ERROR = b"something went wrong whilst reading the spec"
+_MSG_STORAGE_WRITE_ERROR = b"something went wrong whilst storing the spec"
+
+# Responses are specific to a user and clients have to check whether they are stale
+_CACHE_CONTROL = "private, no-cache"
 
 
 def list_(spec_name: types.TSpecId, user: types.TUser) -> server.Response:
@@ -21,26 +49,14 @@ def list_(spec_name: types.TSpecId, user: types.TUser) -> server.Response:
         The response to the request.
 
     """
+    database = package_database.get()
+
     try:
-        return server.Response(
-            json.dumps(
-                package_database.get().list_spec_versions(sub=user, name=spec_name)
-            ),
-            status=200,
-            mimetype="application/json",
-        )
+        return _OK(orjson.dumps(database.list_spec_versions(sub=user, name=spec_name)))
     except package_database.exceptions.NotFoundError:
-        return server.Response(
-            f"could not find spec with id {spec_name}",
-            status=404,
-            mimetype="text/plain",
-        )
+        return _NOT_FOUND(_MSG_SPEC_NOT_FOUND % spec_name.encode())
     except package_database.exceptions.BaseError:
-        return server.Response(
-            "something went wrong whilst reading from the database",
-            status=500,
-            mimetype="text/plain",
-        )
+        return _SERVER_ERROR(_MSG_DATABASE_READ_ERROR)
 
 
 def get(
@@ -49,6 +65,13 @@ def get(
     """
     Retrieve a version of a spec for a user.
 
+    The ETag of the response is calculated based on the information about the spec
+    in the database, the hash of the spec the latest version was created from and the
+    requested version. Returns 304 if the ETag is in the If-None-Match header. The
+    spec is not read from storage for the 304 if the latest version is requested,
+    because the database shows that it exists. Other versions are only known to
+    exist once they have been read from storage.
+
     Args:
         spec_name: The id of the spec.
         version: The version of the spec.
@@ -58,42 +81,47 @@ def get(
         The response to the request.
 
     """
+    storage_facade = storage.get_storage_facade()
+    database = package_database.get()
+
     try:
-        spec_str = storage.get_storage_facade().get_spec(
-            user=user, name=spec_name, version=version
-        )
+        spec_info = database.get_spec(sub=user, name=spec_name)
+        hash_info = database.get_latest_spec_version_hash(sub=user, name=spec_name)
+
+        # Any write to the spec changes the information about the spec
+        etag_data = [
+            spec_info,
+            hash_info.spec_hash if hash_info is not None else None,
+            version,
+        ]
+        etag = f'"{spec.calc_hash(orjson.dumps(etag_data))}"'
+        headers = {"ETag": etag, "Cache-Control": _CACHE_CONTROL}
+        if_none_match = server.Request.request.headers.get("If-None-Match", "")
+        not_modified = etag in (value.strip() for value in if_none_match.split(","))
+        if not_modified and version == spec_info["version"]:
+            return _NOT_MODIFIED(headers=headers)
+
+        spec_str = storage_facade.get_spec(user=user, name=spec_name, version=version)
+        if not_modified:
+            return _NOT_MODIFIED(headers=headers)
         prepared_spec_str = spec.prepare(spec_str=spec_str, version=version)
-        spec_info = package_database.get().get_spec(sub=user, name=spec_name)
 
-        response_data = json.dumps({**spec_info, "value": prepared_spec_str})
+        response_data = orjson.dumps({**spec_info, "value": prepared_spec_str})
 
-        return server.Response(
-            response_data,
-            status=200,
-            mimetype="application/json",
-        )
-    except storage.exceptions.ObjectNotFoundError:
-        return server.Response(
-            f"could not find the spec with id {spec_name}",
-            status=404,
-            mimetype="text/plain",
-        )
+        return _OK(response_data, headers=headers)
+    except (
+        package_database.exceptions.NotFoundError,
+        storage.exceptions.ObjectNotFoundError,
+    ):
+        return _NOT_FOUND(_MSG_SPEC_VERSION_NOT_FOUND % spec_name.encode())
     except storage.exceptions.StorageError:
-        return server.Response(
-            "something went wrong whilst reading the spec",
-            status=500,
-            mimetype="text/plain",
-        )
+        return _SERVER_ERROR(_MSG_STORAGE_READ_ERROR)
     except package_database.exceptions.BaseError:
-        return server.Response(
-            "something went wrong whilst reading from the database",
-            status=500,
-            mimetype="text/plain",
-        )
+        return _SERVER_ERROR(_MSG_DATABASE_READ_ERROR)
 
 
 def put(
-    body: bytearray,
+    body: bytes,
     spec_name: types.TSpecId,
     version: types.TSpecVersion,
     user: types.TUser,
@@ -101,6 +129,9 @@ def put(
     """
     Update a specific version of a spec.
 
+    Skips storing the spec if the latest version is the requested version and was
+    created from the same spec.
+    Returns 400 if the X-LANGUAGE header is missing or not supported.
     Returns 400 if the spec is not valid.
     Returns 400 if the requested version does not match the calculated version.
     Returns 402 if the free tier is exceeded.
@@ -116,67 +147,40 @@ def put(
         The response to the request.
 
     """
-    language = server.Request.request.headers["X-LANGUAGE"]
+    language = server.Request.request.headers.get("X-LANGUAGE")
+    if language not in spec.SUPPORTED_LANGUAGES:
+        return _BAD_REQUEST(_MSG_LANGUAGE_NOT_SUPPORTED)
+    spec_hash = spec.calc_hash(body)
 
     try:
+        # Skip processing and writing the spec if it has not changed
+        if store.is_unchanged(
+            user=user, spec_name=spec_name, spec_hash=spec_hash, version=version
+        ):
+            return _NO_CONTENT()
+
         # Check whether spec is valid
-        spec_info = spec.process(spec_str=body.decode(), language=language)
+        spec_info = spec.process(body=body, language=language)
 
         # Check that the requested versionmatches the calculated version
         if version != spec_info.version:
-            return server.Response(
-                f"the requested version {version} does not match the version of the "
-                f"spec {spec_info.version}",
-                status=400,
-                mimetype="text/plain",
-            )
-
-        # Check that the maximum number of models hasn't been exceeded
-        within_free_tier_result = free_tier.check_within_limit(
-            user=user, spec_name=spec_name, model_count=spec_info.model_count
-        )
-        if not within_free_tier_result.value:
-            return server.Response(
-                within_free_tier_result.reason,
-                status=402,
-                mimetype="text/plain",
+            return _BAD_REQUEST(
+                _MSG_VERSION_MISMATCH % (version.encode(), spec_info.version.encode())
             )
 
-        # Store the spec
-        storage.get_storage_facade().create_update_spec(
-            user=user,
-            name=spec_name,
-            version=spec_info.version,
-            spec_str=spec_info.spec_str,
+        # Write the spec to the database and storage, fails if the free tier is
+        # exceeded
+        store.create_update_spec(
+            user=user, spec_name=spec_name, spec_info=spec_info, spec_hash=spec_hash
         )
 
-        # Write an update into the database
-        package_database.get().create_update_spec(
-            sub=user,
-            name=spec_name,
-            version=spec_info.version,
-            title=spec_info.title,
-            description=spec_info.description,
-            model_count=spec_info.model_count,
-        )
-
-        return server.Response(status=204)
+        return _NO_CONTENT()
 
     except exceptions.LoadSpecError as exc:
-        return server.Response(
-            f"the spec is not valid, {exc}",
-            status=400,
-            mimetype="text/plain",
-        )
+        return _BAD_REQUEST(_MSG_SPEC_NOT_VALID % str(exc).encode())
     except storage.exceptions.StorageError as exc:
-        return server.Response(
-            "something went wrong whilst storing the spec",
-            status=500,
-            mimetype="text/plain",
-        )
+        return _SERVER_ERROR(_MSG_STORAGE_WRITE_ERROR)
+    except package_database.exceptions.FreeTierExceededError as exc:
+        return _PAYMENT_REQUIRED(str(exc).encode())
     except package_database.exceptions.BaseError:
-        return server.Response(
-            "something went wrong whilst updating the database",
-            status=500,
-            mimetype="text/plain",
-        )
+        return _SERVER_ERROR(_MSG_DATABASE_WRITE_ERROR)
@@ -1,6 +1,7 @@
 """Tests for the helpers."""
 
 import json
+import math
 
 import pytest
 from library import exceptions
@@ -9,47 +10,61 @@ from library.helpers import spec
 LOAD_ERROR_TESTS = [
     pytest.param(
         "INVALID",
-        "",
+        b"",
         exceptions.LoadSpecError,
         "unsupported language INVALID, supported languages are JSON and YAML",
         id="invalid language",
     ),
     pytest.param(
         "JSON",
-        "invalid JSON",
+        b"invalid JSON",
         exceptions.LoadSpecError,
         "body must be valid JSON",
         id="invalid JSON",
     ),
+    pytest.param(
+        "JSON",
+        b'{"key": "\xff"}',
+        exceptions.LoadSpecError,
+        "body must be valid JSON",
+        id="invalid JSON encoding",
+    ),
     pytest.param(
         "YAML",
-        "not: valid: YAML",
+        b"not: valid: YAML",
         exceptions.LoadSpecError,
         "body must be valid YAML",
         id="invalid YAML schema",
     ),
     pytest.param(
         "YAML",
-        ":",
+        b":",
         exceptions.LoadSpecError,
         "body must be valid YAML",
         id="invalid YAML value",
     ),
+    pytest.param(
+        "YAML",
+        b"key: \xff",
+        exceptions.LoadSpecError,
+        "body must be valid YAML",
+        id="invalid YAML encoding",
+    ),
 ]
 
 
 @pytest.mark.parametrize(
-    "language, spec_str, expected_exception, expected_reason", LOAD_ERROR_TESTS
+    "language, body, expected_exception, expected_reason", LOAD_ERROR_TESTS
 )
 @pytest.mark.helpers
-def test_load_error(language, spec_str, expected_exception, expected_reason):
+def test_load_error(language, body, expected_exception, expected_reason):
     """
-    GIVEN language and spec string
-    WHEN load is called with the language and spec string
+    GIVEN language and body
+    WHEN load is called with the language and body
     THEN the expected exception is raised with the expected reason.
     """
     with pytest.raises(expected_exception) as exc:
-        spec.load(spec_str=spec_str, language=language)
+        spec.load(body=body, language=language)
 
     assert str(exc.value) == expected_reason
 
@@ -57,30 +72,43 @@ def test_load_error(language, spec_str, expected_exception, expected_reason):
 LOAD_TESTS = [
     pytest.param(
         "JSON",
-        '{"key": "value"}',
+        b'{"key": "value"}',
         id="JSON",
     ),
     pytest.param(
         "YAML",
-        "key: value",
+        b"key: value",
         id="YAML",
     ),
 ]
 
 
-@pytest.mark.parametrize("language, spec_str", LOAD_TESTS)
+@pytest.mark.parametrize("language, body", LOAD_TESTS)
 @pytest.mark.helpers
-def test_load(language, spec_str):
+def test_load(language, body):
     """
-    GIVEN language and spec string
-    WHEN load is called with the language and spec string
+    GIVEN language and body
+    WHEN load is called with the language and body
     THEN the expected spec is returned.
     """
-    returned_spec = spec.load(spec_str=spec_str, language=language)
+    returned_spec = spec.load(body=body, language=language)
 
     assert returned_spec == {"key": "value"}
 
 
+@pytest.mark.helpers
+def test_load_json_non_finite():
+    """
+    GIVEN JSON body with infinite and NaN values
+    WHEN load is called with the body
+    THEN the spec with the infinite and NaN values is returned.
+    """
+    returned_spec = spec.load(body=b'{"key": Infinity, "other": NaN}', language="JSON")
+
+    assert returned_spec["key"] == math.inf
+    assert math.isnan(returned_spec["other"])
+
+
 CALC_VERSION_TESTS = [
     pytest.param("1", "1", id="number"),
     pytest.param("french toast", "440005914211", id="non sense value"),
@@ -113,7 +141,7 @@ def test_process_invalid_str():
     THEN LoadSpecError is raised.
     """
     with pytest.raises(exceptions.LoadSpecError) as exc:
-        spec.process(spec_str="", language="INVAID")
+        spec.process(body=b"", language="INVAID")
 
     assert "INVAID" in str(exc)
 
@@ -126,7 +154,7 @@ def test_process_invalid_schemas():
     THEN LoadSpecError is raised.
     """
     with pytest.raises(exceptions.LoadSpecError) as exc:
-        spec.process(spec_str=json.dumps({}), language="JSON")
+        spec.process(body=json.dumps({}).encode(), language="JSON")
 
     assert "not valid" in str(exc)
 
@@ -155,7 +183,7 @@ def test_process():
     }
     spec_str = json.dumps(spec_dict)
 
-    returned_result = spec.process(spec_str=spec_str, language="JSON")
+    returned_result = spec.process(body=spec_str.encode(), language="JSON")
 
     assert returned_result.version == "508508140393"
     assert returned_result.title == title
@@ -260,7 +288,7 @@ def test_process_model_count(schemas, expected_model_count):
     """
     spec_str = json.dumps({"components": {"schemas": schemas}})
 
-    returned_result = spec.process(spec_str=spec_str, language="JSON")
+    returned_result = spec.process(body=spec_str.encode(), language="JSON")
 
     assert returned_result.model_count == expected_model_count
 
@@ -320,3 +348,17 @@ def test_prepare(version, spec_dict, expected_spec_str):
     returned_spec_str = spec.prepare(spec_str=spec_str, version=version)
 
     assert returned_spec_str == expected_spec_str
+
+
+@pytest.mark.helpers
+def test_calc_hash():
+    """
+    GIVEN bodies
+    WHEN calc_hash is called with the bodies
+    THEN the same hash is returned for the same body and different hashes otherwise.
+    """
+    hash_1 = spec.calc_hash(b"body 1")
+
+    assert spec.calc_hash(b"body 1") == hash_1
+    assert spec.calc_hash(b"body 2") != hash_1
+    assert len(hash_1) == 64
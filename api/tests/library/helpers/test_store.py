@@ -0,0 +1,151 @@
+"""Tests for the store helper."""
+
+from unittest import mock
+
+import pytest
+from library.facades import storage
+from library.helpers import spec, store
+from open_alchemy import package_database
+
+SPEC_INFO = spec.TSpecInfo(
+    spec_str="spec str 1",
+    version="version 1",
+    title="title 1",
+    description="description 1",
+    model_count=1,
+)
+SPEC_HASH = "hash 1"
+
+
+@pytest.mark.parametrize(
+    "stored_spec_hash, spec_hash, version, expected_result",
+    [
+        pytest.param(None, "hash 1", None, False, id="no spec"),
+        pytest.param("hash 1", "hash 2", None, False, id="hash different"),
+        pytest.param("hash 1", "hash 1", None, True, id="hash same"),
+        pytest.param(
+            "hash 1", "hash 1", "version 2", False, id="hash same version different"
+        ),
+        pytest.param(
+            "hash 1", "hash 1", "version 1", True, id="hash same version same"
+        ),
+    ],
+)
+@pytest.mark.helpers
+def test_is_unchanged(
+    _clean_specs_table, stored_spec_hash, spec_hash, version, expected_result
+):
+    """
+    GIVEN database with a spec, spec hash and version
+    WHEN is_unchanged is called with the spec hash and version
+    THEN the expected result is returned.
+    """
+    user = "user 1"
+    spec_name = "spec name 1"
+    if stored_spec_hash is not None:
+        package_database.get().create_update_spec(
+            sub=user,
+            name=spec_name,
+            version="version 1",
+            model_count=1,
+            spec_hash=stored_spec_hash,
+        )
+
+    result = store.is_unchanged(
+        user=user, spec_name=spec_name, spec_hash=spec_hash, version=version
+    )
+
+    assert result == expected_result
+
+
+@pytest.mark.helpers
+def test_create_update_spec(_clean_specs_table):
+    """
+    GIVEN user, spec name and spec info
+    WHEN create_update_spec is called with the user, spec name and spec info
+    THEN the spec is written to the database and storage.
+    """
+    user = "user 1"
+    spec_name = "spec name 1"
+
+    store.create_update_spec(
+        user=user, spec_name=spec_name, spec_info=SPEC_INFO, spec_hash=SPEC_HASH
+    )
+
+    assert (
+        storage.get_storage_facade().get_spec(
+            user=user, name=spec_name, version=SPEC_INFO.version
+        )
+        == SPEC_INFO.spec_str
+    )
+    spec_info = package_database.get().get_spec(sub=user, name=spec_name)
+    assert spec_info["version"] == SPEC_INFO.version
+    assert spec_info["title"] == SPEC_INFO.title
+    assert spec_info["description"] == SPEC_INFO.description
+    assert spec_info["model_count"] == SPEC_INFO.model_count
+    assert package_database.get().get_latest_spec_version_hash(
+        sub=user, name=spec_name
+    ) == package_database.types.SpecHashInfo(
+        version=SPEC_INFO.version, spec_hash=SPEC_HASH
+    )
+
+
+@pytest.mark.helpers
+def test_create_update_spec_database_error(monkeypatch):
+    """
+    GIVEN user, spec name, spec info and database that raises an error
+    WHEN create_update_spec is called with the user, spec name and spec info
+    THEN the database error is raised and the spec is not written to storage.
+    """
+    user = "user 1"
+    spec_name = "spec name 1"
+    mock_database_create_update_spec = mock.MagicMock()
+    mock_database_create_update_spec.side_effect = (
+        package_database.exceptions.FreeTierExceededError
+    )
+    monkeypatch.setattr(
+        package_database.get(),
+        "create_update_spec",
+        mock_database_create_update_spec,
+    )
+    mock_storage_create_update_spec = mock.MagicMock()
+    monkeypatch.setattr(
+        storage.get_storage_facade(),
+        "create_update_spec",
+        mock_storage_create_update_spec,
+    )
+
+    with pytest.raises(package_database.exceptions.FreeTierExceededError):
+        store.create_update_spec(
+            user=user, spec_name=spec_name, spec_info=SPEC_INFO, spec_hash=SPEC_HASH
+        )
+
+    mock_storage_create_update_spec.assert_not_called()
+
+
+@pytest.mark.helpers
+def test_create_update_spec_storage_error(monkeypatch, _clean_specs_table):
+    """
+    GIVEN user, spec name, spec info and storage that raises an error
+    WHEN create_update_spec is called with the user, spec name and spec info
+    THEN the storage error is raised and the hash is not left in the database.
+    """
+    user = "user 1"
+    spec_name = "spec name 1"
+    mock_storage_create_update_spec = mock.MagicMock()
+    mock_storage_create_update_spec.side_effect = storage.exceptions.StorageError
+    monkeypatch.setattr(
+        storage.get_storage_facade(),
+        "create_update_spec",
+        mock_storage_create_update_spec,
+    )
+
+    with pytest.raises(storage.exceptions.StorageError):
+        store.create_update_spec(
+            user=user, spec_name=spec_name, spec_info=SPEC_INFO, spec_hash=SPEC_HASH
+        )
+
+    assert (
+        package_database.get().get_latest_spec_version_hash(sub=user, name=spec_name)
+        is None
+    )
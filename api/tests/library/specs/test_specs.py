@@ -259,7 +259,71 @@ def test_put(monkeypatch, _clean_specs_table):
 
 
 @pytest.mark.specs
-def test_put_invalid_spec_error(monkeypatch):
+def test_put_get_infinity(monkeypatch, _clean_specs_table):
+    """
+    GIVEN YAML body with an infinite value, spec id and user
+    WHEN put is called with the body and then get is called
+    THEN the spec is stored and returned with the infinite value.
+    """
+    mock_request = mock.MagicMock()
+    mock_request.headers = {"X-LANGUAGE": "YAML"}
+    monkeypatch.setattr(server.Request, "request", mock_request)
+    body = b"""
+info:
+  version: "1"
+components:
+  schemas:
+    Schema:
+      type: object
+      x-tablename: schema
+      properties:
+        id:
+          type: integer
+          x-primary-key: true
+        value:
+          type: number
+          maximum: .inf
+"""
+    spec_name = "id 1"
+    user = "user 1"
+
+    response = specs.put(body=body, spec_name=spec_name, user=user)
+
+    assert response.status_code == 204
+
+    response = specs.get(spec_name=spec_name, user=user)
+
+    assert response.status_code == 200
+    assert "maximum: .inf" in json.loads(response.data.decode())["value"]
+
+
+@pytest.mark.parametrize(
+    "headers",
+    [
+        pytest.param({}, id="missing"),
+        pytest.param({"X-LANGUAGE": "INVALID"}, id="not supported"),
+    ],
+)
+@pytest.mark.specs
+def test_put_language_error(monkeypatch, headers):
+    """
+    GIVEN headers with a missing or unsupported language
+    WHEN put is called with a body
+    THEN a 400 is returned.
+    """
+    mock_request = mock.MagicMock()
+    mock_request.headers = headers
+    monkeypatch.setattr(server.Request, "request", mock_request)
+
+    response = specs.put(body=b"body 1", spec_name="id 1", user="user 1")
+
+    assert response.status_code == 400
+    assert response.mimetype == "text/plain"
+    assert "X-LANGUAGE" in response.data.decode()
+
+
+@pytest.mark.specs
+def test_put_invalid_spec_error(monkeypatch, _clean_specs_table):
     """
     GIVEN body with invalid spec and spec id and user
     WHEN put is called with the body, spec id and user
@@ -281,11 +345,11 @@ def test_put_invalid_spec_error(monkeypatch):
 
 
 @pytest.mark.specs
-def test_put_too_many_models_error(monkeypatch, _clean_specs_table):
+def test_put_unchanged(monkeypatch, _clean_specs_table):
     """
-    GIVEN body spec and spec id and user that already has too many models
-    WHEN put is called with the body and spec id
-    THEN a 402 with an invalid spec is returned.
+    GIVEN body, spec id and user where the body has already been stored
+    WHEN put is called with the body, spec id and user
+    THEN a 204 is returned without writing the spec again.
     """
     mock_request = mock.MagicMock()
     mock_headers = {"X-LANGUAGE": "JSON"}
@@ -301,29 +365,30 @@ def test_put_too_many_models_error(monkeypatch, _clean_specs_table):
     }
     body = json.dumps(
         {"info": {"version": version}, "components": {"schemas": schemas}}
-    )
-    spec_name_1 = "id 1"
+    ).encode()
+    spec_name = "id 1"
     user = "user 1"
-    package_database.get().create_update_spec(
-        sub=user, name=spec_name_1, version="1", model_count=100
+    response = specs.put(body=body, spec_name=spec_name, user=user)
+    assert response.status_code == 204
+    mock_storage_create_update_spec = mock.MagicMock()
+    monkeypatch.setattr(
+        storage.get_storage_facade(),
+        "create_update_spec",
+        mock_storage_create_update_spec,
     )
 
-    spec_name_2 = "id 2"
-    response = specs.put(body=body.encode(), spec_name=spec_name_2, user=user)
+    response = specs.put(body=body, spec_name=spec_name, user=user)
 
-    assert response.status_code == 402
-    assert response.mimetype == "text/plain"
-    assert "exceeded" in response.data.decode()
-    assert ": 100," in response.data.decode()
-    assert "spec: 1" in response.data.decode()
+    assert response.status_code == 204
+    mock_storage_create_update_spec.assert_not_called()
 
 
 @pytest.mark.specs
-def test_put_database_count_error(monkeypatch, _clean_specs_table):
+def test_put_too_many_models_error(monkeypatch, _clean_specs_table):
     """
-    GIVEN body with invalid spec and spec id and database that raises DatabaseError
+    GIVEN body spec and spec id and user that already has too many models
     WHEN put is called with the body and spec id
-    THEN a 500 is returned.
+    THEN a 402 with an invalid spec is returned.
     """
     mock_request = mock.MagicMock()
     mock_headers = {"X-LANGUAGE": "JSON"}
@@ -340,23 +405,24 @@ def test_put_database_count_error(monkeypatch, _clean_specs_table):
     body = json.dumps(
         {"info": {"version": version}, "components": {"schemas": schemas}}
     )
-    spec_name = "id 1"
+    spec_name_1 = "id 1"
     user = "user 1"
-    mock_database_count_customer_models = mock.MagicMock()
-    mock_database_count_customer_models.side_effect = (
-        package_database.exceptions.BaseError
-    )
-    monkeypatch.setattr(
-        package_database.get(),
-        "count_customer_models",
-        mock_database_count_customer_models,
+    package_database.get().create_update_spec(
+        sub=user, name=spec_name_1, version="1", model_count=100
     )
 
-    response = specs.put(body=body.encode(), spec_name=spec_name, user=user)
+    spec_name_2 = "id 2"
+    response = specs.put(body=body.encode(), spec_name=spec_name_2, user=user)
 
-    assert response.status_code == 500
+    assert response.status_code == 402
     assert response.mimetype == "text/plain"
-    assert "database" in response.data.decode()
+    assert "exceeded" in response.data.decode()
+    assert ": 100," in response.data.decode()
+    assert "spec: 1" in response.data.decode()
+    with pytest.raises(storage.exceptions.ObjectNotFoundError):
+        storage.get_storage_facade().get_spec(
+            user=user, name=spec_name_2, version=version
+        )
 
 
 @pytest.mark.specs
@@ -403,7 +469,7 @@ def test_put_database_update_error(monkeypatch, _clean_specs_table):
     """
     GIVEN body and spec id
     WHEN put is called with the body and spec id
-    THEN the spec is stored against the spec id.
+    THEN a 500 is returned and the spec is not stored.
     """
     mock_request = mock.MagicMock()
     mock_headers = {"X-LANGUAGE": "JSON"}
@@ -435,13 +501,10 @@ def test_put_database_update_error(monkeypatch, _clean_specs_table):
 
     response = specs.put(body=body.encode(), spec_name=spec_name, user=user)
 
-    spec_str = storage.get_storage_facade().get_spec(
-        user=user, name=spec_name, version=version
-    )
-    assert f'"{version}"' in spec_str
-    assert '"Schema"' in spec_str
-    assert '"x-tablename"' in spec_str
-    assert '"schema"' in spec_str
+    with pytest.raises(storage.exceptions.ObjectNotFoundError):
+        storage.get_storage_facade().get_spec(
+            user=user, name=spec_name, version=version
+        )
     assert package_database.get().count_customer_models(sub=user) == 0
     assert response.status_code == 500
     assert response.mimetype == "text/plain"
@@ -1,6 +1,7 @@
 """Tests for the specs endpoint."""
 
 import json
+import time
 from unittest import mock
 
 import pytest
@@ -80,12 +81,15 @@ def test_list_database_error(monkeypatch):
 
 
 @pytest.mark.specs_versions
-def test_get(_clean_specs_table):
+def test_get(monkeypatch, _clean_specs_table):
     """
     GIVEN user and version and database and storage with a single spec
     WHEN get is called with the user and spec id
-    THEN the spec value is returned.
+    THEN the spec value is returned with an ETag.
     """
+    mock_request = mock.MagicMock()
+    mock_request.headers = {}
+    monkeypatch.setattr(server.Request, "request", mock_request)
     user = "user 1"
     spec_name = "spec name 1"
     version = "1"
@@ -109,15 +113,171 @@ def test_get(_clean_specs_table):
     assert "components: {}" in response_data_json["value"]
     assert response_data_json["name"] == spec_name
     assert response_data_json["version"] == version
+    assert response.headers["ETag"].startswith('"')
+    assert response.headers["Cache-Control"] == "private, no-cache"
+
+
+@pytest.mark.parametrize(
+    "if_none_match_template, expected_status_code",
+    [
+        pytest.param("{etag}", 304, id="match"),
+        pytest.param('"other", {etag}', 304, id="match in list"),
+        pytest.param('"other"', 200, id="no match"),
+    ],
+)
+@pytest.mark.specs_versions
+def test_get_if_none_match(
+    monkeypatch, _clean_specs_table, if_none_match_template, expected_status_code
+):
+    """
+    GIVEN user and version and database and storage with a single spec and the ETag
+        of a previous response
+    WHEN get is called with the user and spec id and If-None-Match header
+    THEN the expected status code is returned with the ETag.
+    """
+    user = "user 1"
+    spec_name = "spec name 1"
+    version = "1"
+    package_database.get().create_update_spec(
+        sub=user, name=spec_name, version=version, model_count=1
+    )
+    storage.get_storage_facade().create_update_spec(
+        user=user, name=spec_name, version=version, spec_str='{"components":{}}'
+    )
+    mock_request = mock.MagicMock()
+    mock_request.headers = {}
+    monkeypatch.setattr(server.Request, "request", mock_request)
+    etag = versions.get(user=user, spec_name=spec_name, version=version).headers["ETag"]
+    mock_request.headers = {"If-None-Match": if_none_match_template.format(etag=etag)}
+
+    response = versions.get(user=user, spec_name=spec_name, version=version)
+
+    assert response.status_code == expected_status_code
+    assert response.headers["ETag"] == etag
 
 
 @pytest.mark.specs_versions
-def test_get_database_miss():
+def test_get_if_none_match_updated(monkeypatch, _clean_specs_table):
+    """
+    GIVEN user and version and database and storage with a single spec and the ETag
+        of a response before the spec was updated
+    WHEN get is called with the user and spec id and If-None-Match header
+    THEN the spec value is returned with a different ETag.
+    """
+    user = "user 1"
+    spec_name = "spec name 1"
+    version = "1"
+    package_database.get().create_update_spec(
+        sub=user, name=spec_name, version=version, model_count=1
+    )
+    storage.get_storage_facade().create_update_spec(
+        user=user, name=spec_name, version=version, spec_str='{"components":{}}'
+    )
+    mock_request = mock.MagicMock()
+    mock_request.headers = {}
+    monkeypatch.setattr(server.Request, "request", mock_request)
+    etag = versions.get(user=user, spec_name=spec_name, version=version).headers["ETag"]
+    package_database.get().create_update_spec(
+        sub=user, name=spec_name, version=version, model_count=2
+    )
+    mock_request.headers = {"If-None-Match": etag}
+
+    response = versions.get(user=user, spec_name=spec_name, version=version)
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+@pytest.mark.specs_versions
+def test_get_if_none_match_spec_hash(monkeypatch, _clean_specs_table):
+    """
+    GIVEN user and version and database and storage with a single spec and the ETag
+        of a response before the spec was stored again from a different spec with
+        the same information
+    WHEN get is called with the user and spec id and If-None-Match header
+    THEN the spec value is returned with a different ETag.
+    """
+    user = "user 1"
+    spec_name = "spec name 1"
+    version = "1"
+    monkeypatch.setattr(time, "time", mock.MagicMock(return_value=1000000))
+    package_database.get().create_update_spec(
+        sub=user, name=spec_name, version=version, model_count=1, spec_hash="hash 1"
+    )
+    storage.get_storage_facade().create_update_spec(
+        user=user, name=spec_name, version=version, spec_str='{"components":{}}'
+    )
+    mock_request = mock.MagicMock()
+    mock_request.headers = {}
+    monkeypatch.setattr(server.Request, "request", mock_request)
+    etag = versions.get(user=user, spec_name=spec_name, version=version).headers["ETag"]
+    package_database.get().create_update_spec(
+        sub=user, name=spec_name, version=version, model_count=1, spec_hash="hash 2"
+    )
+    mock_request.headers = {"If-None-Match": etag}
+
+    response = versions.get(user=user, spec_name=spec_name, version=version)
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+@pytest.mark.parametrize(
+    "delete_version_1, expected_status_code",
+    [
+        pytest.param(False, 304, id="exists"),
+        pytest.param(True, 404, id="deleted"),
+    ],
+)
+@pytest.mark.specs_versions
+def test_get_if_none_match_not_latest(
+    monkeypatch, _clean_specs_table, delete_version_1, expected_status_code
+):
+    """
+    GIVEN user and database and storage with two versions of a spec, the ETag of a
+        response for the version that is not the latest and whether that version
+        was deleted from storage
+    WHEN get is called with the user, spec id, version and If-None-Match header
+    THEN the expected status code is returned and other versions do not match the
+        ETag.
+    """
+    user = "user 1"
+    spec_name = "spec name 1"
+    storage_facade = storage.get_storage_facade()
+    for version in ["1", "2"]:
+        package_database.get().create_update_spec(
+            sub=user, name=spec_name, version=version, model_count=1
+        )
+        storage_facade.create_update_spec(
+            user=user, name=spec_name, version=version, spec_str='{"components":{}}'
+        )
+    mock_request = mock.MagicMock()
+    mock_request.headers = {}
+    monkeypatch.setattr(server.Request, "request", mock_request)
+    etag = versions.get(user=user, spec_name=spec_name, version="1").headers["ETag"]
+    if delete_version_1:
+        storage_facade.delete_spec(user=user, name=spec_name)
+    mock_request.headers = {"If-None-Match": etag}
+
+    response = versions.get(user=user, spec_name=spec_name, version="1")
+
+    assert response.status_code == expected_status_code
+    assert (
+        versions.get(user=user, spec_name=spec_name, version="2").headers.get("ETag")
+        != etag
+    )
+
+
+@pytest.mark.specs_versions
+def test_get_database_miss(monkeypatch, _clean_specs_table):
     """
     GIVEN user and version and databasewithout and storage with a single spec
     WHEN get is called with the user and spec id
-    THEN 500 is returned.
+    THEN 404 is returned.
     """
+    mock_request = mock.MagicMock()
+    mock_request.headers = {}
+    monkeypatch.setattr(server.Request, "request", mock_request)
     user = "user 1"
     spec_name = "spec name 1"
     version = "1"
@@ -131,21 +291,46 @@ def test_get_database_miss():
 
     response = versions.get(user=user, spec_name=spec_name, version=version)
 
+    assert response.status_code == 404
+    assert response.mimetype == "text/plain"
+    assert spec_name in response.data.decode()
+    assert "not find" in response.data.decode()
+
+
+@pytest.mark.specs_versions
+def test_get_database_error(monkeypatch):
+    """
+    GIVEN user and version and database that raises an error
+    WHEN get is called with the user and spec id
+    THEN 500 is returned.
+    """
+    mock_database_get_spec = mock.MagicMock()
+    mock_database_get_spec.side_effect = package_database.exceptions.BaseError
+    monkeypatch.setattr(package_database.get(), "get_spec", mock_database_get_spec)
+
+    response = versions.get(user="user 1", spec_name="spec name 1", version="1")
+
     assert response.status_code == 500
     assert response.mimetype == "text/plain"
     assert "database" in response.data.decode()
 
 
 @pytest.mark.specs_versions
-def test_get_storage_facade_error(monkeypatch):
+def test_get_storage_facade_error(monkeypatch, _clean_specs_table):
     """
     GIVEN user and database with a spec but storage that raises an error
     WHEN get is called with the user and spec id
     THEN a 500 is returned.
     """
+    mock_request = mock.MagicMock()
+    mock_request.headers = {}
+    monkeypatch.setattr(server.Request, "request", mock_request)
     user = "user 1"
     spec_name = "spec name 1"
     version = "1"
+    package_database.get().create_update_spec(
+        sub=user, name=spec_name, version=version, model_count=1
+    )
     mock_storage_get_spec = mock.MagicMock()
     mock_storage_get_spec.side_effect = storage.exceptions.StorageError
     monkeypatch.setattr(storage.get_storage_facade(), "get_spec", mock_storage_get_spec)
@@ -176,6 +361,31 @@ def test_get_storage_facade_miss(_clean_specs_table):
     assert "not find" in response.data.decode()
 
 
+@pytest.mark.specs_versions
+def test_get_database_hit_storage_facade_miss(monkeypatch, _clean_specs_table):
+    """
+    GIVEN user, database with the spec and storage without the version
+    WHEN get is called with the user and spec id
+    THEN a 404 is returned.
+    """
+    mock_request = mock.MagicMock()
+    mock_request.headers = {}
+    monkeypatch.setattr(server.Request, "request", mock_request)
+    user = "user 1"
+    spec_name = "spec name 1"
+    version = "1"
+    package_database.get().create_update_spec(
+        sub=user, name=spec_name, version=version, model_count=1
+    )
+
+    response = versions.get(user=user, spec_name=spec_name, version=version)
+
+    assert response.status_code == 404
+    assert response.mimetype == "text/plain"
+    assert spec_name in response.data.decode()
+    assert "not find" in response.data.decode()
+
+
 @pytest.mark.specs_versions
 def test_put(monkeypatch, _clean_specs_table):
     """
@@ -234,7 +444,74 @@ def test_put(monkeypatch, _clean_specs_table):
 
 
 @pytest.mark.specs_versions
-def test_put_invalid_spec_error(monkeypatch):
+def test_put_get_infinity(monkeypatch, _clean_specs_table):
+    """
+    GIVEN YAML body with an infinite value, spec id, version and user
+    WHEN put is called with the body and then get is called
+    THEN the spec is stored and returned with the infinite value.
+    """
+    mock_request = mock.MagicMock()
+    mock_request.headers = {"X-LANGUAGE": "YAML"}
+    monkeypatch.setattr(server.Request, "request", mock_request)
+    body = b"""
+info:
+  version: "1"
+components:
+  schemas:
+    Schema:
+      type: object
+      x-tablename: schema
+      properties:
+        id:
+          type: integer
+          x-primary-key: true
+        value:
+          type: number
+          maximum: .inf
+"""
+    spec_name = "id 1"
+    version = "1"
+    user = "user 1"
+
+    response = versions.put(body=body, spec_name=spec_name, version=version, user=user)
+
+    assert response.status_code == 204
+
+    response = versions.get(spec_name=spec_name, version=version, user=user)
+
+    assert response.status_code == 200
+    assert "maximum: .inf" in json.loads(response.data.decode())["value"]
+
+
+@pytest.mark.parametrize(
+    "headers",
+    [
+        pytest.param({}, id="missing"),
+        pytest.param({"X-LANGUAGE": "INVALID"}, id="not supported"),
+    ],
+)
+@pytest.mark.specs_versions
+def test_put_language_error(monkeypatch, headers):
+    """
+    GIVEN headers with a missing or unsupported language
+    WHEN put is called with a body
+    THEN a 400 is returned.
+    """
+    mock_request = mock.MagicMock()
+    mock_request.headers = headers
+    monkeypatch.setattr(server.Request, "request", mock_request)
+
+    response = versions.put(
+        body=b"body 1", spec_name="id 1", version="1", user="user 1"
+    )
+
+    assert response.status_code == 400
+    assert response.mimetype == "text/plain"
+    assert "X-LANGUAGE" in response.data.decode()
+
+
+@pytest.mark.specs_versions
+def test_put_invalid_spec_error(monkeypatch, _clean_specs_table):
     """
     GIVEN body with invalid spec, spec id, user and version
     WHEN put is called with the body, spec id, user and version
@@ -259,9 +536,49 @@ def test_put_invalid_spec_error(monkeypatch):
 
 
 @pytest.mark.specs_versions
-def test_put_version_mismatch_error(monkeypatch):
+def test_put_unchanged(monkeypatch, _clean_specs_table):
+    """
+    GIVEN body, spec id and user where the body has already been stored
+    WHEN put is called with the body, spec id and user
+    THEN a 204 is returned without writing the spec again.
+    """
+    mock_request = mock.MagicMock()
+    mock_headers = {"X-LANGUAGE": "JSON"}
+    mock_request.headers = mock_headers
+    monkeypatch.setattr(server.Request, "request", mock_request)
+    version = "1"
+    schemas = {
+        "Schema": {
+            "type": "object",
+            "x-tablename": "schema",
+            "properties": {"id": {"type": "integer"}},
+        }
+    }
+    body = json.dumps(
+        {"info": {"version": version}, "components": {"schemas": schemas}}
+    ).encode()
+    spec_name = "id 1"
+    user = "user 1"
+    response = versions.put(body=body, spec_name=spec_name, version=version, user=user)
+    assert response.status_code == 204
+    mock_storage_create_update_spec = mock.MagicMock()
+    monkeypatch.setattr(
+        storage.get_storage_facade(),
+        "create_update_spec",
+        mock_storage_create_update_spec,
+    )
+
+    response = versions.put(body=body, spec_name=spec_name, version=version, user=user)
+
+    assert response.status_code == 204
+    mock_storage_create_update_spec.assert_not_called()
+
+
+@pytest.mark.specs_versions
+def test_put_version_mismatch_error(monkeypatch, _clean_specs_table):
     """
-    GIVEN body, spec id, user and version different to that in the body
+    GIVEN body that has been stored, spec id, user and version different to that in
+        the body
     WHEN put is called with the body, spec id, user and version
     THEN a 400 with an invalid spec is returned.
     """
@@ -283,6 +600,10 @@ def test_put_version_mismatch_error(monkeypatch):
     spec_name = "id 1"
     user = "user 1"
     version_2 = "version 2"
+    response = versions.put(
+        body=body.encode(), spec_name=spec_name, version=version_1, user=user
+    )
+    assert response.status_code == 204
 
     response = versions.put(
         body=body.encode(), spec_name=spec_name, version=version_2, user=user
@@ -332,14 +653,18 @@ def test_put_too_many_models_error(monkeypatch, _clean_specs_table):
     assert "exceeded" in response.data.decode()
     assert ": 100," in response.data.decode()
     assert "spec: 1" in response.data.decode()
+    with pytest.raises(storage.exceptions.ObjectNotFoundError):
+        storage.get_storage_facade().get_spec(
+            user=user, name=spec_name_2, version=version
+        )
 
 
 @pytest.mark.specs_versions
-def test_put_database_count_error(monkeypatch, _clean_specs_table):
+def test_put_existing_version_too_many_models_error(monkeypatch, _clean_specs_table):
     """
-    GIVEN body with invalid spec and spec id and database that raises DatabaseError
+    GIVEN spec id, user, stored version and body for the version with too many models
     WHEN put is called with the body and spec id
-    THEN a 500 is returned.
+    THEN a 402 is returned and the stored version of the spec is not changed.
     """
     mock_request = mock.MagicMock()
     mock_headers = {"X-LANGUAGE": "JSON"}
@@ -347,34 +672,40 @@ def test_put_database_count_error(monkeypatch, _clean_specs_table):
     monkeypatch.setattr(server.Request, "request", mock_request)
     version = "1"
     schemas = {
-        "Schema": {
+        f"Schema{idx}": {
             "type": "object",
-            "x-tablename": "schema",
+            "x-tablename": f"schema{idx}",
             "properties": {"id": {"type": "integer"}},
         }
+        for idx in range(11)
     }
-    body = json.dumps(
+    body_1 = json.dumps(
+        {
+            "info": {"version": version},
+            "components": {"schemas": {"Schema0": schemas["Schema0"]}},
+        }
+    )
+    body_2 = json.dumps(
         {"info": {"version": version}, "components": {"schemas": schemas}}
     )
     spec_name = "id 1"
     user = "user 1"
-    mock_database_count_customer_models = mock.MagicMock()
-    mock_database_count_customer_models.side_effect = (
-        package_database.exceptions.BaseError
-    )
-    monkeypatch.setattr(
-        package_database.get(),
-        "count_customer_models",
-        mock_database_count_customer_models,
+    response = versions.put(
+        body=body_1.encode(), spec_name=spec_name, version=version, user=user
     )
+    assert response.status_code == 204
 
     response = versions.put(
-        body=body.encode(), spec_name=spec_name, version=version, user=user
+        body=body_2.encode(), spec_name=spec_name, version=version, user=user
     )
 
-    assert response.status_code == 500
-    assert response.mimetype == "text/plain"
-    assert "database" in response.data.decode()
+    assert response.status_code == 402
+    response = versions.get(spec_name=spec_name, version=version, user=user)
+    assert response.status_code == 200
+    spec_str = json.loads(response.data.decode())["value"]
+    assert "Schema0:" in spec_str
+    assert "Schema1:" not in spec_str
+    assert package_database.get().count_customer_models(sub=user) == 1
 
 
 @pytest.mark.specs_versions
@@ -418,12 +749,64 @@ def test_put_storage_error(monkeypatch, _clean_specs_table):
     assert "storing" in response.data.decode()
 
 
+@pytest.mark.specs_versions
+def test_put_storage_error_retry(monkeypatch, _clean_specs_table):
+    """
+    GIVEN body, spec id, version, user and storage that fails once
+    WHEN put is called with the body and spec id and called again once it fails
+    THEN the spec is stored.
+    """
+    mock_request = mock.MagicMock()
+    mock_headers = {"X-LANGUAGE": "JSON"}
+    mock_request.headers = mock_headers
+    monkeypatch.setattr(server.Request, "request", mock_request)
+    version = "1"
+    schemas = {
+        "Schema": {
+            "type": "object",
+            "x-tablename": "schema",
+            "properties": {"id": {"type": "integer"}},
+        }
+    }
+    body = json.dumps(
+        {"info": {"version": version}, "components": {"schemas": schemas}}
+    )
+    spec_name = "id 1"
+    user = "user 1"
+    storage_facade = storage.get_storage_facade()
+    storage_create_update_spec = storage_facade.create_update_spec
+
+    def create_update_spec_fail_once(**kwargs):
+        """Raise StorageError on the first call and store the spec afterwards."""
+        if mock_storage_create_update_spec.call_count == 1:
+            raise storage.exceptions.StorageError
+        storage_create_update_spec(**kwargs)
+
+    mock_storage_create_update_spec = mock.MagicMock()
+    mock_storage_create_update_spec.side_effect = create_update_spec_fail_once
+    monkeypatch.setattr(
+        storage_facade, "create_update_spec", mock_storage_create_update_spec
+    )
+    response = versions.put(
+        body=body.encode(), spec_name=spec_name, version=version, user=user
+    )
+    assert response.status_code == 500
+
+    response = versions.put(
+        body=body.encode(), spec_name=spec_name, version=version, user=user
+    )
+
+    assert response.status_code == 204
+    spec_str = storage_facade.get_spec(user=user, name=spec_name, version=version)
+    assert "x-tablename" in spec_str
+
+
 @pytest.mark.specs_versions
 def test_put_database_update_error(monkeypatch, _clean_specs_table):
     """
     GIVEN body and spec id
     WHEN put is called with the body and spec id
-    THEN the spec is stored against the spec id.
+    THEN a 500 is returned and the spec is not stored.
     """
     mock_request = mock.MagicMock()
     mock_headers = {"X-LANGUAGE": "JSON"}
@@ -457,13 +840,10 @@ def test_put_database_update_error(monkeypatch, _clean_specs_table):
         body=body.encode(), spec_name=spec_name, version=version, user=user
     )
 
-    spec_str = storage.get_storage_facade().get_spec(
-        user=user, name=spec_name, version=version
-    )
-    assert f'"{version}"' in spec_str
-    assert '"Schema"' in spec_str
-    assert '"x-tablename"' in spec_str
-    assert '"schema"' in spec_str
+    with pytest.raises(storage.exceptions.ObjectNotFoundError):
+        storage.get_storage_facade().get_spec(
+            user=user, name=spec_name, version=version
+        )
     assert package_database.get().count_customer_models(sub=user) == 0
     assert response.status_code == 500
     assert response.mimetype == "text/plain"
@@ -2,13 +2,8 @@
 
 from . import dynamodb, exceptions, types
 
-
-def _construct() -> types.TDatabase:
-    """Construct the database facade."""
-    return dynamodb.Database()
-
-
-_DATABASE = _construct()
+# The functions of the DynamoDB module implement the facade
+_DATABASE: types.TDatabase = dynamodb
 
 
 def get() -> types.TDatabase:
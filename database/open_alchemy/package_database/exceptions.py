@@ -7,3 +7,7 @@ class BaseError(Exception):
 
 class NotFoundError(BaseError):
     """When an item was not found in the database."""
+
+
+class FreeTierExceededError(BaseError):
+    """When a write would exceed the free tier."""
@@ -4,12 +4,17 @@ import time
 import typing
 
 from packaging import utils
-from pynamodb import attributes, indexes, models
+from pynamodb import attributes, connection
+from pynamodb import constants as pynamodb_constants
+from pynamodb import exceptions as pynamodb_exceptions
+from pynamodb import indexes, models, settings, transactions
+from pynamodb.expressions import condition as conditions
 
 from . import config, exceptions, types
 
 TSpecUpdatedAtId = str
 TSpecIdUpdatedAt = str
+TRawItem = typing.Dict[str, typing.Dict[str, str]]
 
 
 class TSpecIndexValues(typing.NamedTuple):
@@ -19,6 +24,31 @@ class TSpecIndexValues(typing.NamedTuple):
     id_updated_at: TSpecIdUpdatedAt
 
 
+def _batch_delete(
+    *, model: typing.Type[models.Model], items: typing.Iterable[models.Model]
+) -> None:
+    """
+    Delete items using batch writes of up to 25 items each.
+
+    Raises BaseError if some items could not be deleted after retrying. Batches that
+    were written before the failure are not rolled back, so some of the items may have
+    been deleted.
+
+    Args:
+        model: The model of the items.
+        items: The items to delete, only the keys are required.
+
+    """
+    try:
+        with model.batch_write() as batch:
+            for item in items:
+                batch.delete(item)
+    except pynamodb_exceptions.PutError as exc:
+        raise exceptions.BaseError(
+            "could not delete all items, some items may have been deleted"
+        ) from exc
+
+
 class IdUpdatedAtIndex(indexes.LocalSecondaryIndex):
     """Local secondary index for querying based on id."""
 
@@ -35,6 +65,59 @@ class IdUpdatedAtIndex(indexes.LocalSecondaryIndex):
     id_updated_at = attributes.UnicodeAttribute(range_key=True)
 
 
+class CustomerAggregate(models.Model):
+    """
+    Aggregate information about the specs of a customer.
+
+    Stored in the specs table in the partition of the customer. The sort key does not
+    start with a digit or 'latest#' and there is no id_updated_at so that it is not
+    returned by any of the queries for specs.
+
+    Attrs:
+        UPDATED_AT_ID: Constant value of the sort key of the aggregate
+
+        sub: Unique identifier for a customer
+        updated_at_id: Always set to UPDATED_AT_ID
+        model_count: The sum of model_count on the latest version of each spec
+
+    """
+
+    UPDATED_AT_ID = "aggregate"
+
+    class Meta:
+        """Meta class."""
+
+        table_name = config.get().specs_table_name
+
+        if config.get().stage == config.Stage.TEST:
+            host = "http://localhost:8000"
+
+    sub = attributes.UnicodeAttribute(hash_key=True)
+    updated_at_id = attributes.UnicodeAttribute(range_key=True)
+
+    model_count = attributes.NumberAttribute()
+
+    @classmethod
+    def get_model_count(cls, *, sub: types.TSub) -> typing.Optional[int]:
+        """
+        Get the number of models on the latest specs for a customer.
+
+        Args:
+            sub: Unique identifier for the customer.
+
+        Returns:
+            The model count of the aggregate or None if the aggregate does not exist.
+
+        """
+        try:
+            item = cls.get(
+                sub, cls.UPDATED_AT_ID, attributes_to_get=_AGGREGATE_COUNT_ATTRIBUTES
+            )
+        except cls.DoesNotExist:
+            return None
+        return int(item.model_count)
+
+
 class Spec(models.Model):
     """
     Information about a spec.
@@ -42,6 +125,12 @@ class Spec(models.Model):
     Attrs:
         UPDATED_AT_LATEST: Constant for what to set updated_at to to indicate it is the
             latest record
+        CREATE_UPDATE_ITEM_ATTEMPTS: The number of times a create or update is tried if
+            it conflicts with a concurrent write
+        INFO_ATTRIBUTES: The attributes required to calculate the information about a
+            spec, used to project queries that list specs
+        QUERY_PAGE_SIZE: The maximum number of items to evaluate per page of a raw
+            query, None for as many as fit in a page
 
         sub: Unique identifier for a customer
         id: Unique identifier for a spec for a package derrived from the name
@@ -54,6 +143,7 @@ class Spec(models.Model):
         title: The title of a spec
         description: The description of a spec
         model_count: The number of 'x-tablename' and 'x-inherits' in a spec
+        spec_hash: The hash of the spec the version was created from
 
         updated_at_id: Combination of 'updated_at' and 'id' separeted with #
         id_updated_at: Combination of 'id' and 'updated_at' separeted with #
@@ -63,6 +153,17 @@ class Spec(models.Model):
     """
 
     UPDATED_AT_LATEST = "latest"
+    CREATE_UPDATE_ITEM_ATTEMPTS = 3
+    INFO_ATTRIBUTES = (
+        "name",
+        "id",
+        "updated_at",
+        "version",
+        "title",
+        "description",
+        "model_count",
+    )
+    QUERY_PAGE_SIZE: typing.Optional[int] = None
 
     class Meta:
         """Meta class."""
@@ -81,6 +182,7 @@ class Spec(models.Model):
     title = attributes.UnicodeAttribute(null=True)
     description = attributes.UnicodeAttribute(null=True)
     model_count = attributes.NumberAttribute()
+    spec_hash = attributes.UnicodeAttribute(null=True)
 
     updated_at_id = attributes.UnicodeAttribute(range_key=True)
     id_updated_at = attributes.UnicodeAttribute()
@@ -106,10 +208,7 @@ class Spec(models.Model):
         return sum(
             map(
                 lambda item: int(item.model_count),
-                cls.query(
-                    sub,
-                    cls.updated_at_id.startswith(f"{cls.UPDATED_AT_LATEST}#"),
-                ),
+                cls.query(sub, _SPEC_LATEST_CONDITION),
             )
         )
 
@@ -152,6 +251,8 @@ class Spec(models.Model):
         model_count: types.TSpecModelCount,
         title: types.TSpecTitle = None,
         description: types.TSpecDescription = None,
+        free_tier_model_count: typing.Optional[int] = None,
+        spec_hash: types.TOptSpecHash = None,
     ) -> None:
         """
         Create or update an item.
@@ -161,6 +262,16 @@ class Spec(models.Model):
         'latest'. Also computes the sort key updated_at_id based on updated_at and
         id.
 
+        The latest item and the aggregate for the customer are read in a single
+        transaction. The new model count for the customer is calculated and, if it is
+        within the free tier, both items and the updated aggregate are written in a
+        single transaction that is conditional on the latest item and the aggregate
+        not having changed. The aggregate is initialized by counting the models of
+        the customer if it does not exist. Conflicting writes are retried.
+
+        Raises FreeTierExceededError if the model count for the customer would exceed
+        the free tier.
+
         Args:
             sub: Unique identifier for a cutsomer.
             name: The display name of the spec.
@@ -168,11 +279,14 @@ class Spec(models.Model):
             model_count: The number of models in the spec.
             title: The title of a spec
             description: The description of a spec
+            free_tier_model_count: The maximum number of models for the customer, if
+                it is None there is no maximum.
+            spec_hash: The hash of the spec the version was created from.
 
         """
         id_ = cls.calc_id(name)
 
-        # Write item
+        # Calculate item
         updated_at = str(int(time.time()))
         index_values = cls.calc_index_values(updated_at=updated_at, id_=id_)
         item = cls(
@@ -184,12 +298,12 @@ class Spec(models.Model):
             title=title,
             description=description,
             model_count=model_count,
+            spec_hash=spec_hash,
             updated_at_id=index_values.updated_at_id,
             id_updated_at=index_values.id_updated_at,
         )
-        item.save()
 
-        # Write latest item
+        # Calculate latest item
         updated_at_latest = cls.UPDATED_AT_LATEST
         index_values_latest = cls.calc_index_values(
             updated_at=updated_at_latest, id_=id_
@@ -203,10 +317,103 @@ class Spec(models.Model):
             title=title,
             description=description,
             model_count=model_count,
+            spec_hash=spec_hash,
             updated_at_id=index_values_latest.updated_at_id,
             id_updated_at=index_values_latest.id_updated_at,
         )
-        item_latest.save()
+
+        for _ in range(cls.CREATE_UPDATE_ITEM_ATTEMPTS):
+            # Read the current state
+            transaction_get: transactions.TransactGet[typing.Any] = (
+                transactions.TransactGet(connection=_CONNECTION)
+            )
+            try:
+                with transaction_get:
+                    stored_item_latest_future = transaction_get.get(
+                        cls, sub, index_values_latest.updated_at_id
+                    )
+                    stored_aggregate_future = transaction_get.get(
+                        CustomerAggregate, sub, CustomerAggregate.UPDATED_AT_ID
+                    )
+            except pynamodb_exceptions.TransactGetError as exc:
+                raise exceptions.BaseError(
+                    f"could not read spec {name=} for customer {sub=}"
+                ) from exc
+            try:
+                stored_item_latest: typing.Optional[Spec] = (
+                    stored_item_latest_future.get()
+                )
+            except cls.DoesNotExist:
+                stored_item_latest = None
+            try:
+                stored_aggregate: typing.Optional[CustomerAggregate] = (
+                    stored_aggregate_future.get()
+                )
+            except CustomerAggregate.DoesNotExist:
+                stored_aggregate = None
+
+            # Calculate the new model count
+            spec_model_count = (
+                int(stored_item_latest.model_count)
+                if stored_item_latest is not None
+                else 0
+            )
+            customer_model_count = (
+                int(stored_aggregate.model_count)
+                if stored_aggregate is not None
+                else cls.count_customer_models(sub=sub)
+            )
+            new_customer_model_count = (
+                customer_model_count - spec_model_count + model_count
+            )
+            if (
+                free_tier_model_count is not None
+                and new_customer_model_count > free_tier_model_count
+            ):
+                raise exceptions.FreeTierExceededError(
+                    "with this spec the maximum number of "
+                    f"{free_tier_model_count} models for the free "
+                    f"tier would be exceeded, current models count: "
+                    f"{customer_model_count}, "
+                    f"current models in the spec: {spec_model_count}, "
+                    f"models in the new version of the spec: {model_count}, "
+                    f"new total model count: {new_customer_model_count}"
+                )
+
+            # Write the items if nothing has changed
+            aggregate = CustomerAggregate(
+                sub=sub,
+                updated_at_id=CustomerAggregate.UPDATED_AT_ID,
+                model_count=new_customer_model_count,
+            )
+            transaction_write = transactions.TransactWrite(connection=_CONNECTION)
+            try:
+                with transaction_write:
+                    transaction_write.save(item)
+                    transaction_write.save(
+                        item_latest,
+                        condition=(
+                            cls.model_count == spec_model_count
+                            if stored_item_latest is not None
+                            else cls.sub.does_not_exist()
+                        ),
+                    )
+                    transaction_write.save(
+                        aggregate,
+                        condition=(
+                            CustomerAggregate.model_count == customer_model_count
+                            if stored_aggregate is not None
+                            else CustomerAggregate.sub.does_not_exist()
+                        ),
+                    )
+                return
+            except pynamodb_exceptions.TransactWriteError as exc:
+                last_exc = exc
+
+        raise exceptions.BaseError(
+            f"could not write spec {name=} for customer {sub=}, the spec or the "
+            "model count of the customer was modified concurrently"
+        ) from last_exc
 
     @classmethod
     def get_latest_version(
@@ -242,6 +449,73 @@ class Spec(models.Model):
                 f"the spec {name=}, {id_=} does not exist for customer {sub=}"
             ) from exc
 
+    @classmethod
+    def get_latest_hash(
+        cls, *, sub: types.TSub, name: types.TSpecName
+    ) -> typing.Optional[types.SpecHashInfo]:
+        """
+        Get the hash of the spec the latest version was created from.
+
+        Retrieves only the version and spec_hash of the latest item for the spec.
+
+        Args:
+            sub: Unique identifier for a cutsomer.
+            name: The display name of the spec.
+
+        Returns:
+            The latest version and its hash or None if the spec does not exist or no
+            hash was stored for the latest version.
+
+        """
+        id_ = cls.calc_id(name)
+        try:
+            item = cls.get(
+                hash_key=sub,
+                range_key=cls.calc_index_values(
+                    updated_at=cls.UPDATED_AT_LATEST, id_=id_
+                ).updated_at_id,
+                attributes_to_get=_SPEC_HASH_ATTRIBUTES,
+            )
+        except cls.DoesNotExist:
+            return None
+        if item.spec_hash is None:
+            return None
+        return types.SpecHashInfo(version=item.version, spec_hash=item.spec_hash)
+
+    @classmethod
+    def delete_latest_hash(
+        cls, *, sub: types.TSub, name: types.TSpecName, spec_hash: types.TSpecHash
+    ) -> None:
+        """
+        Delete the hash of the spec the latest version was created from.
+
+        Only deletes the hash if it has not changed in the meantime, does nothing if
+        the spec does not exist or has a different hash.
+
+        Args:
+            sub: Unique identifier for a cutsomer.
+            name: The display name of the spec.
+            spec_hash: The hash to delete.
+
+        """
+        id_ = cls.calc_id(name)
+        item = cls(
+            sub=sub,
+            updated_at_id=cls.calc_index_values(
+                updated_at=cls.UPDATED_AT_LATEST, id_=id_
+            ).updated_at_id,
+        )
+        try:
+            item.update(
+                actions=[cls.spec_hash.remove()], condition=cls.spec_hash == spec_hash
+            )
+        except pynamodb_exceptions.UpdateError as exc:
+            if exc.cause_response_code == "ConditionalCheckFailedException":
+                return
+            raise exceptions.BaseError(
+                f"could not delete the hash of spec {name=} for customer {sub=}"
+            ) from exc
+
     @staticmethod
     def item_to_info(item: "Spec") -> types.TSpecInfo:
         """Convert item to dict with information about the spec."""
@@ -258,6 +532,62 @@ class Spec(models.Model):
             info["description"] = item.description
         return info
 
+    @staticmethod
+    def raw_item_to_info(raw_item: TRawItem) -> types.TSpecInfo:
+        """Convert raw DynamoDB item to dict with information about the spec."""
+        info: types.TSpecInfo = {
+            "name": raw_item["name"]["S"],
+            "id": raw_item["id"]["S"],
+            "updated_at": int(raw_item["updated_at"]["S"]),
+            "version": raw_item["version"]["S"],
+            "model_count": int(raw_item["model_count"]["N"]),
+        }
+        if "title" in raw_item:
+            info["title"] = raw_item["title"]["S"]
+        if "description" in raw_item:
+            info["description"] = raw_item["description"]["S"]
+        return info
+
+    @classmethod
+    def query_raw(
+        cls,
+        *,
+        sub: types.TSub,
+        range_key_condition: conditions.Condition,
+        attributes_to_get: typing.List[str],
+        index_name: typing.Optional[str] = None,
+    ) -> typing.Iterator[TRawItem]:
+        """
+        Query the table without converting the items to models.
+
+        Follows the pages of the query until all items have been returned.
+
+        Args:
+            sub: Unique identifier for a cutsomer.
+            range_key_condition: The condition on the sort key of the table or index.
+            attributes_to_get: The attributes to retrieve for each item.
+            index_name: The index to query, if any.
+
+        Returns:
+            The items as returned by DynamoDB.
+
+        """
+        last_evaluated_key = None
+        while True:
+            page = _CONNECTION.query(
+                cls.Meta.table_name,
+                sub,
+                range_key_condition=range_key_condition,
+                attributes_to_get=attributes_to_get,
+                exclusive_start_key=last_evaluated_key,
+                index_name=index_name,
+                limit=cls.QUERY_PAGE_SIZE,
+            )
+            yield from page[pynamodb_constants.ITEMS]
+            last_evaluated_key = page.get(pynamodb_constants.LAST_EVALUATED_KEY)
+            if last_evaluated_key is None:
+                return
+
     @classmethod
     def list_(cls, *, sub: types.TSub) -> types.TSpecInfoList:
         """
@@ -274,10 +604,11 @@ class Spec(models.Model):
         """
         return list(
             map(
-                cls.item_to_info,
-                cls.query(
-                    sub,
-                    cls.updated_at_id.startswith(f"{cls.UPDATED_AT_LATEST}#"),
+                cls.raw_item_to_info,
+                cls.query_raw(
+                    sub=sub,
+                    range_key_condition=_SPEC_LATEST_CONDITION,
+                    attributes_to_get=_SPEC_INFO_ATTRIBUTES,
                 ),
             )
         )
@@ -321,11 +652,21 @@ class Spec(models.Model):
         """
         id_ = cls.calc_id(name)
         items = cls.id_updated_at_index.query(
-            sub, cls.id_updated_at.startswith(f"{id_}#")
+            sub,
+            cls.id_updated_at.startswith(f"{id_}#"),
+            attributes_to_get=_SPEC_KEY_ATTRIBUTES,
         )
-        with cls.batch_write() as batch:
-            for item in items:
-                batch.delete(item)
+        _batch_delete(model=cls, items=items)
+
+        # The aggregate is re-initialized on the next write
+        try:
+            CustomerAggregate(
+                sub=sub, updated_at_id=CustomerAggregate.UPDATED_AT_ID
+            ).delete()
+        except pynamodb_exceptions.DeleteError as exc:
+            raise exceptions.BaseError(
+                f"could not delete the model count for customer {sub=}"
+            ) from exc
 
     @classmethod
     def list_versions(
@@ -334,7 +675,8 @@ class Spec(models.Model):
         """
         List all available versions for a spec for a customer.
 
-        Filters for a customer and for updated_at_id to start with latest.
+        Filters for a customer and for id_updated_at to start with the id of the spec
+        and removes the latest version.
 
         Args:
             sub: Unique identifier for a cutsomer.
@@ -345,29 +687,49 @@ class Spec(models.Model):
 
         """
         id_ = cls.calc_id(name)
-        items = cls.id_updated_at_index.query(
-            sub,
-            cls.id_updated_at.startswith(f"{id_}#"),
+        raw_items = cls.query_raw(
+            sub=sub,
+            range_key_condition=cls.id_updated_at.startswith(f"{id_}#"),
+            attributes_to_get=_SPEC_VERSION_INFO_ATTRIBUTES,
+            index_name=_SPEC_ID_UPDATED_AT_INDEX_NAME,
         )
-        items_no_latest = filter(
-            lambda item: not item.updated_at_id.startswith(f"{cls.UPDATED_AT_LATEST}#"),
-            items,
+        raw_items_no_latest = filter(
+            lambda raw_item: not raw_item["updated_at_id"]["S"].startswith(
+                _SPEC_LATEST_PREFIX
+            ),
+            raw_items,
         )
-        return list(map(cls.item_to_info, items_no_latest))
+        return list(map(cls.raw_item_to_info, raw_items_no_latest))
 
     @classmethod
     def delete_all(cls, *, sub: types.TSub) -> None:
         """
         Delete all the specs for a user.
 
+        Also deletes the aggregate for the customer because it is stored in the same
+        partition.
+
         Args:
             sub: Unique identifier for a cutsomer.
 
         """
-        items = cls.query(hash_key=sub)
-        with cls.batch_write() as batch:
-            for item in items:
-                batch.delete(item)
+        items = cls.query(hash_key=sub, attributes_to_get=_SPEC_KEY_ATTRIBUTES)
+        _batch_delete(model=cls, items=items)
+
+
+# The static parts of the spec queries, calculated once rather than on every query
+_SPEC_LATEST_PREFIX = f"{Spec.UPDATED_AT_LATEST}#"
+_SPEC_LATEST_CONDITION = Spec.updated_at_id.startswith(_SPEC_LATEST_PREFIX)
+_SPEC_INFO_ATTRIBUTES = list(Spec.INFO_ATTRIBUTES)
+_SPEC_VERSION_INFO_ATTRIBUTES = [*Spec.INFO_ATTRIBUTES, "updated_at_id"]
+_SPEC_ID_UPDATED_AT_INDEX_NAME = Spec.id_updated_at_index.Meta.index_name
+_SPEC_HASH_ATTRIBUTES = ["version", "spec_hash"]
+_SPEC_KEY_ATTRIBUTES = ["sub", "updated_at_id"]
+_AGGREGATE_COUNT_ATTRIBUTES = ["model_count"]
+
+_CONNECTION = connection.Connection(
+    region=settings.get_settings_value("region"), host=Spec.Meta.host
+)
 
 
 class PublicKeyIndex(indexes.GlobalSecondaryIndex):
@@ -545,7 +907,8 @@ class Credentials(models.Model):
             sub: Unique identifier for a cutsomer.
 
         """
-        items = cls.query(hash_key=sub)
-        with cls.batch_write() as batch:
-            for item in items:
-                batch.delete(item)
+        items = cls.query(hash_key=sub, attributes_to_get=_CREDENTIALS_KEY_ATTRIBUTES)
+        _batch_delete(model=cls, items=items)
+
+
+_CREDENTIALS_KEY_ATTRIBUTES = ["sub", "id"]
@@ -14,6 +14,8 @@ TSpecDescription = str
 TOptSpecDescription = typing.Optional[TSpecDescription]
 TSpecUpdatedAt = str
 TSpecModelCount = int
+TSpecHash = str
+TOptSpecHash = typing.Optional[TSpecHash]
 
 TCredentialsId = str
 TCredentialsPublicKey = str
@@ -86,11 +88,25 @@ class CredentialsAuthInfo:
     salt: TCredentialsSalt
 
 
+@dataclasses.dataclass
+class SpecHashInfo:
+    """
+    Information about the spec the latest version of a spec was created from.
+
+    Attrs:
+        version: The latest version of the spec.
+        spec_hash: The hash of the spec the latest version was created from.
+
+    """
+
+    version: TSpecVersion
+    spec_hash: TSpecHash
+
+
 class TDatabase(typing.Protocol):
     """Interface for database."""
 
-    @staticmethod
-    def count_customer_models(*, sub: TSub) -> int:
+    def count_customer_models(self, *, sub: TSub) -> int:
         """
         Count the number of models a customer has stored.
 
@@ -103,19 +119,24 @@ class TDatabase(typing.Protocol):
         """
         ...
 
-    @staticmethod
     def create_update_spec(
+        self,
         *,
         sub: TSub,
         name: TSpecName,
         version: TSpecVersion,
         model_count: TSpecModelCount,
         title: TOptSpecTitle = None,
-        description: TSpecDescription = None
+        description: TSpecDescription = None,
+        free_tier_model_count: typing.Optional[int] = None,
+        spec_hash: TOptSpecHash = None
     ) -> None:
         """
         Create or update a spec.
 
+        Raises FreeTierExceededError if the model count for the customer would exceed
+        the free tier.
+
         Args:
             sub: Unique identifier for a cutsomer.
             name: The display name of the spec.
@@ -123,12 +144,14 @@ class TDatabase(typing.Protocol):
             model_count: The number of models in the spec.
             title: The title of a spec.
             description: The description of a spec.
+            free_tier_model_count: The maximum number of models for the customer, if
+                it is None there is no maximum.
+            spec_hash: The hash of the spec the version was created from.
 
         """
         ...
 
-    @staticmethod
-    def get_latest_spec_version(*, sub: TSub, name: TSpecName) -> TSpecVersion:
+    def get_latest_spec_version(self, *, sub: TSub, name: TSpecName) -> TSpecVersion:
         """
         Get the latest version for a spec.
 
@@ -144,8 +167,40 @@ class TDatabase(typing.Protocol):
         """
         ...
 
-    @staticmethod
-    def list_specs(*, sub: TSub) -> TSpecInfoList:
+    def get_latest_spec_version_hash(
+        self, *, sub: TSub, name: TSpecName
+    ) -> typing.Optional[SpecHashInfo]:
+        """
+        Get the hash of the spec the latest version of a spec was created from.
+
+        Args:
+            sub: Unique identifier for a cutsomer.
+            name: The display name of the spec.
+
+        Returns:
+            The latest version and its hash or None if the spec does not exist or no
+            hash was stored for the latest version.
+
+        """
+        ...
+
+    def delete_latest_spec_version_hash(
+        self, *, sub: TSub, name: TSpecName, spec_hash: TSpecHash
+    ) -> None:
+        """
+        Delete the hash of the spec the latest version of a spec was created from.
+
+        Does nothing if the latest version was created from a different spec.
+
+        Args:
+            sub: Unique identifier for a cutsomer.
+            name: The display name of the spec.
+            spec_hash: The hash to delete.
+
+        """
+        ...
+
+    def list_specs(self, *, sub: TSub) -> TSpecInfoList:
         """
         List all available specs for a customer.
 
@@ -158,8 +213,7 @@ class TDatabase(typing.Protocol):
         """
         ...
 
-    @staticmethod
-    def get_spec(*, sub: TSub, name: TSpecName) -> TSpecInfo:
+    def get_spec(self, *, sub: TSub, name: TSpecName) -> TSpecInfo:
         """
         Retrieve a spec from the database.
 
@@ -175,8 +229,7 @@ class TDatabase(typing.Protocol):
         """
         ...
 
-    @staticmethod
-    def delete_spec(*, sub: TSub, name: TSpecName) -> None:
+    def delete_spec(self, *, sub: TSub, name: TSpecName) -> None:
         """
         Delete a spec from the database.
 
@@ -187,8 +240,7 @@ class TDatabase(typing.Protocol):
         """
         ...
 
-    @staticmethod
-    def list_spec_versions(*, sub: TSub, name: TSpecName) -> TSpecInfoList:
+    def list_spec_versions(self, *, sub: TSub, name: TSpecName) -> TSpecInfoList:
         """
         List all available versions for a spec for a customer.
 
@@ -204,8 +256,7 @@ class TDatabase(typing.Protocol):
         """
         ...
 
-    @staticmethod
-    def delete_all_specs(*, sub: TSub) -> None:
+    def delete_all_specs(self, *, sub: TSub) -> None:
         """
         Delete all the specs for a user.
 
@@ -215,8 +266,7 @@ class TDatabase(typing.Protocol):
         """
         ...
 
-    @staticmethod
-    def list_credentials(*, sub: TSub) -> TCredentialsInfoList:
+    def list_credentials(self, *, sub: TSub) -> TCredentialsInfoList:
         """
         List all available credentials for a user.
 
@@ -231,8 +281,8 @@ class TDatabase(typing.Protocol):
         """
         ...
 
-    @staticmethod
     def create_update_credentials(
+        self,
         *,
         sub: TSub,
         id_: TCredentialsId,
@@ -253,9 +303,8 @@ class TDatabase(typing.Protocol):
         """
         ...
 
-    @staticmethod
     def get_credentials(
-        *, sub: TSub, id_: TCredentialsId
+        self, *, sub: TSub, id_: TCredentialsId
     ) -> typing.Optional[TCredentialsInfo]:
         """
         Retrieve credentials.
@@ -270,9 +319,8 @@ class TDatabase(typing.Protocol):
         """
         ...
 
-    @staticmethod
     def get_user(
-        *, public_key: TCredentialsPublicKey
+        self, *, public_key: TCredentialsPublicKey
     ) -> typing.Optional[CredentialsAuthInfo]:
         """
         Retrieve a user and information to authenticate the user.
@@ -286,8 +334,7 @@ class TDatabase(typing.Protocol):
         """
         ...
 
-    @staticmethod
-    def delete_credentials(*, sub: TSub, id_: TCredentialsId) -> None:
+    def delete_credentials(self, *, sub: TSub, id_: TCredentialsId) -> None:
         """
         Delete the credentials.
 
@@ -298,8 +345,7 @@ class TDatabase(typing.Protocol):
         """
         ...
 
-    @staticmethod
-    def delete_all_credentials(*, sub: TSub) -> None:
+    def delete_all_credentials(self, *, sub: TSub) -> None:
         """
         Delete all the credentials for a user.
 
@@ -309,8 +355,7 @@ class TDatabase(typing.Protocol):
         """
         ...
 
-    @classmethod
-    def delete_all(cls, *, sub: TSub) -> None:
+    def delete_all(self, *, sub: TSub) -> None:
         """
         Delete all the items for a user.
 
@@ -5,6 +5,7 @@ from unittest import mock
 
 import pytest
 from open_alchemy import package_database
+from open_alchemy.package_database import models
 
 
 def test_count_customer_models(_clean_specs_table):
@@ -38,6 +39,57 @@ def test_count_customer_models(_clean_specs_table):
     assert database_instance.count_customer_models(sub="sub 2") == 0
 
 
+def test_create_update_spec_free_tier_exceeded(_clean_specs_table):
+    """
+    GIVEN sub with a spec
+    WHEN create_update_spec is called with a model count that would exceed the free
+        tier
+    THEN FreeTierExceededError is raised.
+    """
+    sub = "sub 1"
+    database_instance = package_database.get()
+    database_instance.create_update_spec(
+        sub=sub, name="name 1", version="version 1", model_count=5
+    )
+
+    with pytest.raises(package_database.exceptions.FreeTierExceededError):
+        database_instance.create_update_spec(
+            sub=sub,
+            name="name 2",
+            version="version 1",
+            model_count=6,
+            free_tier_model_count=10,
+        )
+
+    assert database_instance.count_customer_models(sub=sub) == 5
+
+
+def test_count_customer_models_aggregate(_clean_specs_table):
+    """
+    GIVEN sub with a spec and with or without the aggregate for the sub
+    WHEN count_customer_models is called
+    THEN the model count of the aggregate is returned if it exists, otherwise the
+        models on the latest specs are counted.
+    """
+    sub = "sub 1"
+    database_instance = package_database.get()
+    database_instance.create_update_spec(
+        sub=sub, name="name 1", version="version 1", model_count=1
+    )
+
+    models.CustomerAggregate(
+        sub=sub, updated_at_id=models.CustomerAggregate.UPDATED_AT_ID, model_count=2
+    ).save()
+
+    assert database_instance.count_customer_models(sub=sub) == 2
+
+    models.CustomerAggregate(
+        sub=sub, updated_at_id=models.CustomerAggregate.UPDATED_AT_ID
+    ).delete()
+
+    assert database_instance.count_customer_models(sub=sub) == 1
+
+
 def test_get_latest_spec_version(_clean_specs_table):
     """
     GIVEN sub, name, version and model count
@@ -74,6 +126,81 @@ def test_get_latest_spec_version(_clean_specs_table):
         database_instance.get_latest_spec_version(sub="sub 2", name=name)
 
 
+def test_get_latest_spec_version_hash(_clean_specs_table):
+    """
+    GIVEN sub, name, version, model count and spec hash
+    WHEN create_update_spec is called with the spec info and
+        get_latest_spec_version_hash is called
+    THEN the latest version and hash is returned.
+    """
+    sub = "sub 1"
+    name = "name 1"
+    database_instance = package_database.get()
+
+    assert database_instance.get_latest_spec_version_hash(sub=sub, name=name) is None
+
+    version_1 = "version 1"
+    model_count = 1
+    database_instance.create_update_spec(
+        sub=sub, name=name, version=version_1, model_count=model_count
+    )
+
+    assert database_instance.get_latest_spec_version_hash(sub=sub, name=name) is None
+
+    version_2 = "version 2"
+    spec_hash = "hash 2"
+    database_instance.create_update_spec(
+        sub=sub,
+        name=name,
+        version=version_2,
+        model_count=model_count,
+        spec_hash=spec_hash,
+    )
+
+    assert database_instance.get_latest_spec_version_hash(
+        sub=sub, name=name
+    ) == package_database.types.SpecHashInfo(version=version_2, spec_hash=spec_hash)
+
+    assert (
+        database_instance.get_latest_spec_version_hash(sub=sub, name="name 2") is None
+    )
+    assert (
+        database_instance.get_latest_spec_version_hash(sub="sub 2", name=name) is None
+    )
+
+
+def test_delete_latest_spec_version_hash(_clean_specs_table):
+    """
+    GIVEN sub, name, version, model count and spec hash
+    WHEN create_update_spec is called with the spec info and
+        delete_latest_spec_version_hash is called
+    THEN the hash is deleted only if it is the same.
+    """
+    sub = "sub 1"
+    name = "name 1"
+    version = "version 1"
+    spec_hash = "hash 1"
+    database_instance = package_database.get()
+    database_instance.create_update_spec(
+        sub=sub, name=name, version=version, model_count=1, spec_hash=spec_hash
+    )
+
+    database_instance.delete_latest_spec_version_hash(
+        sub=sub, name=name, spec_hash="hash 2"
+    )
+
+    assert database_instance.get_latest_spec_version_hash(
+        sub=sub, name=name
+    ) == package_database.types.SpecHashInfo(version=version, spec_hash=spec_hash)
+
+    database_instance.delete_latest_spec_version_hash(
+        sub=sub, name=name, spec_hash=spec_hash
+    )
+
+    assert database_instance.get_latest_spec_version_hash(sub=sub, name=name) is None
+    assert database_instance.get_spec(sub=sub, name=name)["version"] == version
+
+
 def test_list_delete_all_spec(_clean_specs_table):
     """
     GIVEN sub, name, version and model count
@@ -182,6 +309,7 @@ def test_delete_spec(_clean_specs_table):
     database_instance.delete_spec(sub=sub, name=name)
 
     assert len(database_instance.list_specs(sub=sub)) == 0
+    assert models.CustomerAggregate.count(sub) == 0
     assert database_instance.count_customer_models(sub=sub) == 0
     with pytest.raises(package_database.exceptions.NotFoundError):
         database_instance.get_latest_spec_version(sub=sub, name=name)
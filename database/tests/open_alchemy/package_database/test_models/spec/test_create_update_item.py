@@ -4,8 +4,9 @@ import time
 from unittest import mock
 
 import pytest
-from open_alchemy.package_database import factory, models
+from open_alchemy.package_database import exceptions, factory, models
 from packaging import utils
+from pynamodb import exceptions as pynamodb_exceptions
 
 
 @pytest.mark.parametrize(
@@ -95,7 +96,42 @@ def test_create_update_item_empty(sub, name, version, title, description, model_
     assert item.id_updated_at == f"{item.id}#{models.Spec.UPDATED_AT_LATEST}"
 
     items = list(models.Spec.scan())
-    assert len(items) == 2
+    assert len(items) == 3
+
+    aggregate = models.CustomerAggregate.get(
+        sub, models.CustomerAggregate.UPDATED_AT_ID
+    )
+    assert aggregate.model_count == model_count
+
+
+@pytest.mark.models
+def test_create_update_item_spec_hash():
+    """
+    GIVEN empty database, spec information and spec hash
+    WHEN create_update_item is called on Spec with the spec information and hash
+    THEN the hash is stored on the item and on the latest item.
+    """
+    sub = "sub 1"
+    spec_hash = "hash 1"
+
+    models.Spec.create_update_item(
+        sub=sub, name="name 1", version="version 1", model_count=1, spec_hash=spec_hash
+    )
+
+    items = list(models.Spec.query(sub, models.Spec.updated_at_id.startswith("0")))
+    assert len(items) == 1
+    [item] = items
+    assert item.spec_hash == spec_hash
+
+    items = list(
+        models.Spec.query(
+            sub,
+            models.Spec.updated_at_id.startswith(f"{models.Spec.UPDATED_AT_LATEST}#"),
+        )
+    )
+    assert len(items) == 1
+    [item] = items
+    assert item.spec_hash == spec_hash
 
 
 @pytest.mark.models
@@ -146,7 +182,12 @@ def test_create_update_item_single():
     assert int(item.updated_at) == pytest.approx(time.time(), abs=10)
 
     items = list(models.Spec.scan())
-    assert len(items) == 3
+    assert len(items) == 4
+
+    aggregate = models.CustomerAggregate.get(
+        sub, models.CustomerAggregate.UPDATED_AT_ID
+    )
+    assert aggregate.model_count == model_count
 
 
 @pytest.mark.models
@@ -216,7 +257,12 @@ def test_create_update_item_update(monkeypatch):
     assert item.version == version_2
 
     items = list(models.Spec.scan())
-    assert len(items) == 3
+    assert len(items) == 4
+
+    aggregate = models.CustomerAggregate.get(
+        sub, models.CustomerAggregate.UPDATED_AT_ID
+    )
+    assert aggregate.model_count == model_count_2
 
     # Call again with different name by same canonical name
     name_2 = "NAME 1"
@@ -237,3 +283,174 @@ def test_create_update_item_update(monkeypatch):
     assert different_item.model_count == model_count_2
     assert different_item.version == version_2
     assert int(different_item.updated_at) == time_2
+
+
+@pytest.mark.parametrize(
+    "initial_model_counts, model_count, free_tier_model_count, expected_model_count",
+    [
+        pytest.param({}, 10, None, 10, id="no free tier"),
+        pytest.param({}, 10, 10, 10, id="empty at limit"),
+        pytest.param({"name 2": 4}, 6, 10, 10, id="other spec at limit"),
+        pytest.param({"name 1": 8}, 10, 10, 10, id="same spec at limit"),
+        pytest.param(
+            {"name 1": 8, "name 2": 2}, 8, 10, 10, id="multiple spec at limit"
+        ),
+    ],
+)
+@pytest.mark.models
+def test_create_update_item_free_tier(
+    initial_model_counts, model_count, free_tier_model_count, expected_model_count
+):
+    """
+    GIVEN database with specs without an aggregate, model count and free tier model
+        count
+    WHEN create_update_item is called on Spec with the model count and free tier
+        model count
+    THEN the item is created and the aggregate is initialized with the model count of
+        the customer.
+    """
+    sub = "sub 1"
+    for initial_name, initial_model_count in initial_model_counts.items():
+        factory.SpecFactory(
+            sub=sub,
+            name=initial_name,
+            id=initial_name,
+            model_count=initial_model_count,
+            updated_at_id=f"{models.Spec.UPDATED_AT_LATEST}#{initial_name}",
+        ).save()
+
+    models.Spec.create_update_item(
+        sub=sub,
+        name="name 1",
+        version="version 1",
+        model_count=model_count,
+        free_tier_model_count=free_tier_model_count,
+    )
+
+    aggregate = models.CustomerAggregate.get(
+        sub, models.CustomerAggregate.UPDATED_AT_ID
+    )
+    assert aggregate.model_count == expected_model_count
+    assert models.Spec.count_customer_models(sub=sub) == expected_model_count
+
+
+@pytest.mark.models
+def test_create_update_item_free_tier_exceeded():
+    """
+    GIVEN database with a spec for a customer
+    WHEN create_update_item is called on Spec with a model count that would exceed the
+        free tier
+    THEN FreeTierExceededError is raised and the database is not changed.
+    """
+    sub = "sub 1"
+    name_1 = "name 1"
+    models.Spec.create_update_item(
+        sub=sub, name=name_1, version="version 1", model_count=8
+    )
+
+    with pytest.raises(exceptions.FreeTierExceededError) as exc_info:
+        models.Spec.create_update_item(
+            sub=sub,
+            name="name 2",
+            version="version 1",
+            model_count=3,
+            free_tier_model_count=10,
+        )
+
+    assert "current models count: 8," in str(exc_info.value)
+    assert "new total model count: 11" in str(exc_info.value)
+    aggregate = models.CustomerAggregate.get(
+        sub, models.CustomerAggregate.UPDATED_AT_ID
+    )
+    assert aggregate.model_count == 8
+    assert len(list(models.Spec.scan())) == 3
+
+
+@pytest.mark.models
+def test_create_update_item_concurrent_write(monkeypatch):
+    """
+    GIVEN database where another write happens after the aggregate is read
+    WHEN create_update_item is called on Spec
+    THEN the write is retried with the aggregate written by the other write.
+    """
+    sub = "sub 1"
+    original_count_customer_models = models.Spec.count_customer_models
+
+    def mock_count_customer_models(*, sub):
+        """Write the aggregate as if another instance did it."""
+        count = original_count_customer_models(sub=sub)
+        models.CustomerAggregate(
+            sub=sub,
+            updated_at_id=models.CustomerAggregate.UPDATED_AT_ID,
+            model_count=count + 5,
+        ).save()
+        return count
+
+    monkeypatch.setattr(
+        models.Spec, "count_customer_models", mock_count_customer_models
+    )
+
+    models.Spec.create_update_item(
+        sub=sub, name="name 1", version="version 1", model_count=3
+    )
+
+    aggregate = models.CustomerAggregate.get(
+        sub, models.CustomerAggregate.UPDATED_AT_ID
+    )
+    assert aggregate.model_count == 8
+
+
+@pytest.mark.models
+def test_create_update_item_concurrent_write_attempts_exceeded(monkeypatch):
+    """
+    GIVEN database where another write always happens after the aggregate is read
+    WHEN create_update_item is called on Spec
+    THEN BaseError is raised.
+    """
+    sub = "sub 1"
+    monkeypatch.setattr(models.Spec, "CREATE_UPDATE_ITEM_ATTEMPTS", 1)
+
+    def mock_count_customer_models(*, sub):
+        """Write the aggregate as if another instance did it."""
+        models.CustomerAggregate(
+            sub=sub,
+            updated_at_id=models.CustomerAggregate.UPDATED_AT_ID,
+            model_count=5,
+        ).save()
+        return 0
+
+    monkeypatch.setattr(
+        models.Spec, "count_customer_models", mock_count_customer_models
+    )
+
+    with pytest.raises(exceptions.BaseError):
+        models.Spec.create_update_item(
+            sub=sub, name="name 1", version="version 1", model_count=3
+        )
+
+    assert (
+        len(list(models.Spec.query(sub, models.Spec.updated_at_id.startswith("0"))))
+        == 0
+    )
+
+
+@pytest.mark.models
+def test_create_update_item_read_error(monkeypatch):
+    """
+    GIVEN database where reading the current state fails
+    WHEN create_update_item is called on Spec
+    THEN BaseError is raised and nothing is written.
+    """
+    mock_transact_get_items = mock.MagicMock()
+    mock_transact_get_items.side_effect = pynamodb_exceptions.TransactGetError("failed")
+    monkeypatch.setattr(
+        models._CONNECTION, "transact_get_items", mock_transact_get_items
+    )
+
+    with pytest.raises(exceptions.BaseError) as exc:
+        models.Spec.create_update_item(
+            sub="sub 1", name="name 1", version="version 1", model_count=3
+        )
+
+    assert not isinstance(exc.value, exceptions.FreeTierExceededError)
+    assert len(list(models.Spec.scan())) == 0
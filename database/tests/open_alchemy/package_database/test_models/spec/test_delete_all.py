@@ -1,7 +1,10 @@
 """Tests for the models."""
 
+from unittest import mock
+
 import pytest
-from open_alchemy.package_database import factory, models
+from open_alchemy.package_database import exceptions, factory, models
+from pynamodb import exceptions as pynamodb_exceptions
 
 DELETE_ALL_TESTS = [
     pytest.param([], "sub 1", 0, id="empty"),
@@ -61,3 +64,24 @@ def test_delete_all(items, sub, expected_count):
     models.Spec.delete_all(sub=sub)
 
     assert len(list(models.Spec.scan())) == expected_count
+
+
+@pytest.mark.models
+def test_delete_all_error(monkeypatch):
+    """
+    GIVEN database with an item and batch write that fails
+    WHEN delete_all is called with the sub
+    THEN BaseError is raised.
+    """
+    sub = "sub 1"
+    factory.SpecFactory(sub=sub).save()
+    mock_batch_write = mock.MagicMock()
+    mock_batch_write.return_value.__enter__.return_value.delete.side_effect = (
+        pynamodb_exceptions.PutError
+    )
+    monkeypatch.setattr(models.Spec, "batch_write", mock_batch_write)
+
+    with pytest.raises(exceptions.BaseError) as exc:
+        models.Spec.delete_all(sub=sub)
+
+    assert "some items may have been deleted" in str(exc.value)
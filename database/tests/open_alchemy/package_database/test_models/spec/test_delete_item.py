@@ -1,7 +1,10 @@
 """Tests for the models."""
 
+from unittest import mock
+
 import pytest
-from open_alchemy.package_database import factory, models
+from open_alchemy.package_database import exceptions, factory, models
+from pynamodb import exceptions as pynamodb_exceptions
 
 DELETE_ITEM_TESTS = [
     pytest.param([], "sub 1", "name 1", 0, id="empty"),
@@ -158,3 +161,21 @@ def test_delete_item(items, sub, name, expected_item_count):
     models.Spec.delete_item(sub=sub, name=name)
 
     assert len(list(models.Spec.scan())) == expected_item_count
+
+
+@pytest.mark.models
+def test_delete_item_aggregate_error(monkeypatch):
+    """
+    GIVEN database with a spec and deleting the aggregate that fails
+    WHEN delete_item is called on Spec with the sub and spec name
+    THEN BaseError is raised.
+    """
+    sub = "sub 1"
+    name = "name 1"
+    factory.SpecFactory(sub=sub, name=name, id=name, id_updated_at=f"{name}#11").save()
+    mock_delete = mock.MagicMock()
+    mock_delete.side_effect = pynamodb_exceptions.DeleteError("failed")
+    monkeypatch.setattr(models.CustomerAggregate, "delete", mock_delete)
+
+    with pytest.raises(exceptions.BaseError):
+        models.Spec.delete_item(sub=sub, name=name)
@@ -0,0 +1,96 @@
+"""Tests for the models."""
+
+from unittest import mock
+
+import pytest
+from open_alchemy.package_database import exceptions, factory, models, types
+from pynamodb import exceptions as pynamodb_exceptions
+
+DELETE_LATEST_HASH_TESTS = [
+    pytest.param([], "sub 1", "name 1", "hash 1", None, id="empty"),
+    pytest.param(
+        [
+            factory.SpecFactory(
+                sub="sub 1",
+                name="name 1",
+                id="name 1",
+                version="version 1",
+                spec_hash="hash 1",
+                updated_at_id=f"{models.Spec.UPDATED_AT_LATEST}#name 1",
+            )
+        ],
+        "sub 1",
+        "name 1",
+        "hash 2",
+        types.SpecHashInfo(version="version 1", spec_hash="hash 1"),
+        id="single item hash different",
+    ),
+    pytest.param(
+        [
+            factory.SpecFactory(
+                sub="sub 1",
+                name="name 1",
+                id="name 1",
+                version="version 1",
+                updated_at_id=f"{models.Spec.UPDATED_AT_LATEST}#name 1",
+            )
+        ],
+        "sub 1",
+        "name 1",
+        "hash 1",
+        None,
+        id="single item no hash",
+    ),
+    pytest.param(
+        [
+            factory.SpecFactory(
+                sub="sub 1",
+                name="NAME 1",
+                id="name 1",
+                version="version 1",
+                spec_hash="hash 1",
+                updated_at_id=f"{models.Spec.UPDATED_AT_LATEST}#name 1",
+            )
+        ],
+        "sub 1",
+        "NAME 1",
+        "hash 1",
+        None,
+        id="single item hash same",
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    "items, sub, name, spec_hash, expected_hash_info",
+    DELETE_LATEST_HASH_TESTS,
+)
+@pytest.mark.models
+def test_delete_latest_hash(items, sub, name, spec_hash, expected_hash_info):
+    """
+    GIVEN items in the database and sub, spec name and spec hash
+    WHEN delete_latest_hash is called on Spec with the sub, spec name and spec hash
+    THEN the hash is only deleted if it is the same.
+    """
+    for item in items:
+        item.save()
+
+    models.Spec.delete_latest_hash(sub=sub, name=name, spec_hash=spec_hash)
+
+    assert models.Spec.get_latest_hash(sub=sub, name=name) == expected_hash_info
+    assert models.Spec.count() == len(items)
+
+
+@pytest.mark.models
+def test_delete_latest_hash_error(monkeypatch):
+    """
+    GIVEN update that raises an error that is not because of the condition
+    WHEN delete_latest_hash is called on Spec
+    THEN BaseError is raised.
+    """
+    mock_update = mock.MagicMock()
+    mock_update.side_effect = pynamodb_exceptions.UpdateError
+    monkeypatch.setattr(models.Spec, "update", mock_update)
+
+    with pytest.raises(exceptions.BaseError):
+        models.Spec.delete_latest_hash(sub="sub 1", name="name 1", spec_hash="hash 1")
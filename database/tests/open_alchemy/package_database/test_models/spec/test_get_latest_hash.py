@@ -0,0 +1,122 @@
+"""Tests for the models."""
+
+import pytest
+from open_alchemy.package_database import factory, models, types
+
+GET_LATEST_HASH_TESTS = [
+    pytest.param([], "sub 1", "name 1", None, id="empty"),
+    pytest.param(
+        [
+            factory.SpecFactory(
+                sub="sub 2",
+                name="name 1",
+                id="name 1",
+                version="version 1",
+                spec_hash="hash 1",
+                updated_at_id=f"{models.Spec.UPDATED_AT_LATEST}#name 1",
+            )
+        ],
+        "sub 1",
+        "name 1",
+        None,
+        id="single item sub miss",
+    ),
+    pytest.param(
+        [
+            factory.SpecFactory(
+                sub="sub 1",
+                name="name 2",
+                id="name 2",
+                version="version 1",
+                spec_hash="hash 1",
+                updated_at_id=f"{models.Spec.UPDATED_AT_LATEST}#name 2",
+            )
+        ],
+        "sub 1",
+        "name 1",
+        None,
+        id="single item name miss",
+    ),
+    pytest.param(
+        [
+            factory.SpecFactory(
+                sub="sub 1",
+                name="name 1",
+                id="name 1",
+                version="version 1",
+                spec_hash="hash 1",
+                updated_at_id="11#name 1",
+            )
+        ],
+        "sub 1",
+        "name 1",
+        None,
+        id="single item updated_at_id miss",
+    ),
+    pytest.param(
+        [
+            factory.SpecFactory(
+                sub="sub 1",
+                name="name 1",
+                id="name 1",
+                version="version 1",
+                updated_at_id=f"{models.Spec.UPDATED_AT_LATEST}#name 1",
+            )
+        ],
+        "sub 1",
+        "name 1",
+        None,
+        id="single item no hash",
+    ),
+    pytest.param(
+        [
+            factory.SpecFactory(
+                sub="sub 1",
+                name="name 1",
+                id="name 1",
+                version="version 1",
+                spec_hash="hash 1",
+                updated_at_id=f"{models.Spec.UPDATED_AT_LATEST}#name 1",
+            )
+        ],
+        "sub 1",
+        "name 1",
+        types.SpecHashInfo(version="version 1", spec_hash="hash 1"),
+        id="single item hit",
+    ),
+    pytest.param(
+        [
+            factory.SpecFactory(
+                sub="sub 1",
+                name="NAME 1",
+                id="name 1",
+                version="version 1",
+                spec_hash="hash 1",
+                updated_at_id=f"{models.Spec.UPDATED_AT_LATEST}#name 1",
+            )
+        ],
+        "sub 1",
+        "NAME 1",
+        types.SpecHashInfo(version="version 1", spec_hash="hash 1"),
+        id="single item different canonical name",
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    "items, sub, name, expected_hash_info",
+    GET_LATEST_HASH_TESTS,
+)
+@pytest.mark.models
+def test_get_latest_hash(items, sub, name, expected_hash_info):
+    """
+    GIVEN items in the database and sub and spec name
+    WHEN get_latest_hash is called on Spec with the sub and spec name
+    THEN the expected hash information is returned.
+    """
+    for item in items:
+        item.save()
+
+    returned_hash_info = models.Spec.get_latest_hash(sub=sub, name=name)
+
+    assert returned_hash_info == expected_hash_info
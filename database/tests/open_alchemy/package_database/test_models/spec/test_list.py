@@ -100,13 +100,18 @@ LIST_SPECS_TESTS = [
 
 
 @pytest.mark.parametrize("items, sub, expected_idx_list", LIST_SPECS_TESTS)
+@pytest.mark.parametrize(
+    "page_size",
+    [pytest.param(None, id="single page"), pytest.param(1, id="multiple pages")],
+)
 @pytest.mark.models
-def test_list_(items, sub, expected_idx_list):
+def test_list_(monkeypatch, items, sub, expected_idx_list, page_size):
     """
-    GIVEN items in the database and sub
+    GIVEN items in the database, sub and query page size
     WHEN list_ is called on Spec with the sub
     THEN the expected spec ids are returned.
     """
+    monkeypatch.setattr(models.Spec, "QUERY_PAGE_SIZE", page_size)
     for item in items:
         item.save()
 
@@ -184,13 +184,18 @@ LIST_VERSIONS_TESTS = [
     "items, sub, name, expected_idx_list",
     LIST_VERSIONS_TESTS,
 )
+@pytest.mark.parametrize(
+    "page_size",
+    [pytest.param(None, id="single page"), pytest.param(1, id="multiple pages")],
+)
 @pytest.mark.models
-def test_list_versions(items, sub, name, expected_idx_list):
+def test_list_versions(monkeypatch, items, sub, name, expected_idx_list, page_size):
     """
-    GIVEN items in the database and sub and spec name
+    GIVEN items in the database, sub and query page size and spec name
     WHEN list_versions is called on Spec with the sub and spec name
     THEN the expected spec infos are returned.
     """
+    monkeypatch.setattr(models.Spec, "QUERY_PAGE_SIZE", page_size)
     for item in items:
         item.save()
 
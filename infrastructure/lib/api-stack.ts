@@ -139,6 +139,7 @@ export class ApiStack extends cdk.Stack {
         throttlingRateLimit: CONFIG.api.throttlingRateLimit,
       },
       deploy: true,
+      minimumCompressionSize: CONFIG.api.minimumCompressionSize,
       defaultCorsPreflightOptions: {
         allowOrigins: apigateway.Cors.ALL_ORIGINS,
         allowMethods: apigateway.Cors.ALL_METHODS,
@@ -6,6 +6,7 @@ export const CONFIG = {
     recordName: 'package.api',
     throttlingBurstLimit: 200,
     throttlingRateLimit: 100,
+    minimumCompressionSize: 1024,
     additionalAllowHeaders: ['x-language'],
     defaultCredentialsId: 'default',
   },
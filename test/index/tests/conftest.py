@@ -3,26 +3,82 @@
 import os
 import subprocess
 import sys
+import threading
 import uuid
-from urllib import request
+from concurrent import futures
 
 import pytest
+import requests
+from requests import adapters
+
+DELETE_WORKERS = 16
+
+
+@pytest.fixture(scope="session")
+def http_adapter():
+    """Returns a HTTP adapter that re-uses connections across tests and threads."""
+    adapter = adapters.HTTPAdapter(pool_maxsize=DELETE_WORKERS)
+
+    yield adapter
+
+    adapter.close()
+
+
+@pytest.fixture(scope="session")
+def delete(http_adapter):
+    """
+    Returns a function that queues a DELETE request.
+
+    The requests run in the background, each worker with its own session that uses
+    the shared adapter. The responses are checked once all tests have completed.
+
+    """
+    thread_local = threading.local()
+
+    def create_session():
+        """Create the session of a worker."""
+        thread_local.session = requests.Session()
+        thread_local.session.mount("https://", http_adapter)
+
+    def delete_url(url, headers):
+        """Send the DELETE request to the url and return the status code."""
+        return thread_local.session.delete(url, headers=headers).status_code
+
+    executor = futures.ThreadPoolExecutor(
+        max_workers=DELETE_WORKERS, initializer=create_session
+    )
+    delete_futures = []
+
+    def submit(url, *, headers):
+        """Queue a DELETE request to the url."""
+        delete_futures.append((url, executor.submit(delete_url, url, headers)))
+
+    yield submit
+
+    executor.shutdown(wait=True)
+    failures = []
+    for url, delete_future in delete_futures:
+        try:
+            status_code = delete_future.result()
+        except requests.RequestException as exc:
+            failures.append(f"{url}: {exc}")
+            continue
+        if status_code != 204:
+            failures.append(f"{url}: {status_code}")
+    assert not failures, failures
 
 
 @pytest.fixture()
-def spec_name(access_token):
+def spec_name(access_token, delete):
     """Returns a spec id that is cleaned up at the end."""
     spec_name_value = f"IndexSpecId-{uuid.uuid4()}"
 
     yield spec_name_value
 
-    delete_request = request.Request(
+    delete(
         f"https://package.api.openalchemy.io/v1/specs/{spec_name_value}",
         headers={"Authorization": f"Bearer {access_token}"},
-        method="DELETE",
     )
-    with request.urlopen(delete_request) as response:
-        assert response.status == 204
 
     subprocess.run(
         [sys.executable, "-m", "pip", "uninstall", "-y", spec_name_value],